@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Benchmark de desempenho do Split Audio.
+Gera um áudio sintético reprodutível e mede, separadamente, decodificação,
+fatiamento, exportação e transcrição, além das funções de ponta a ponta
+(dividir_audio e dividir_e_transcrever_completa). Roda offline: por padrão a
+transcrição usa um modelo falso, sem Whisper.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import split_audio
+
+# Ordem das etapas no relatório
+ETAPAS = ['decodificacao', 'fatiamento', 'exportacao', 'transcricao', 'divisao', 'transcricao_completa']
+
+# Etapas cujo tempo entra no fator de tempo real total (as demais já as incluem)
+ETAPAS_ISOLADAS = ['decodificacao', 'fatiamento', 'exportacao', 'transcricao']
+
+# Duração da fixture curta usada no aquecimento, fora da medição
+DURACAO_AQUECIMENTO_S = 5
+
+# Diferenças menores que isso (em segundos) são tratadas como ruído na comparação
+RUIDO_MINIMO_S = 0.05
+
+class ModeloFalso:
+    """Substituto do modelo Whisper: mesma interface de transcribe(), sem inferência."""
+
+    name = 'falso'
+
+    def transcribe(self, audio, **opcoes):
+        duracao = len(audio) / split_audio.TAXA_WHISPER
+        texto = f" Segmento sintético de {duracao:.1f} segundos."
+        return {'text': texto, 'segments': [{'start': 0.0, 'end': duracao, 'text': texto}]}
+
+def gerar_fixture(pasta, duracao_s, sample_rate, canais, formato='wav', semente=0):
+    """
+    Gera (ou reaproveita) um arquivo de áudio sintético parecido com fala.
+
+    Trechos de 0,5–2 s com tons harmônicos modulados em amplitude (~4 Hz,
+    ritmo de sílabas) se alternam com pausas, sobre um ruído de fundo baixo.
+    O conteúdo depende só dos parâmetros e da semente, e o arquivo é escrito
+    em blocos de um minuto para não ocupar memória em fixtures longas.
+    """
+    import numpy as np
+    import soundfile as sf
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"fixture_{duracao_s:g}s_{sample_rate}hz_{canais}ch_s{semente}.{formato}")
+    if os.path.exists(caminho):
+        return caminho
+
+    gerador = np.random.default_rng(semente)
+    total_amostras = int(duracao_s * sample_rate)
+    amostras_bloco = 60 * sample_rate
+    # Trecho atual: (amostras restantes, frequência fundamental ou 0 para pausa)
+    restantes, fundamental = 0, 0.0
+    temporario = caminho + '.tmp'
+    with sf.SoundFile(temporario, 'w', samplerate=sample_rate, channels=canais,
+                      format=formato.upper(), subtype='PCM_16' if formato != 'ogg' else 'VORBIS') as arquivo:
+        escritas = 0
+        while escritas < total_amostras:
+            tamanho = min(amostras_bloco, total_amostras - escritas)
+            bloco = np.empty(tamanho, dtype=np.float32)
+            posicao = 0
+            while posicao < tamanho:
+                if restantes == 0:
+                    restantes = int(gerador.uniform(0.5, 2.0) * sample_rate)
+                    fundamental = gerador.uniform(100, 300) if gerador.random() < 0.7 else 0.0
+                n = min(restantes, tamanho - posicao)
+                t = (escritas + posicao + np.arange(n)) / sample_rate
+                if fundamental:
+                    voz = sum(np.sin(2 * np.pi * fundamental * h * t) / h for h in (1, 2, 3))
+                    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+                    bloco[posicao:posicao + n] = 0.2 * voz * envelope
+                else:
+                    bloco[posicao:posicao + n] = 0.0
+                posicao += n
+                restantes -= n
+            bloco += gerador.normal(0, 0.001, tamanho).astype(np.float32)
+            arquivo.write(np.repeat(bloco[:, None], canais, axis=1) if canais > 1 else bloco)
+            escritas += tamanho
+    os.replace(temporario, caminho)
+    return caminho
+
+@contextlib.contextmanager
+def silenciar():
+    """Descarta as mensagens do split_audio (e a barra do tqdm) durante a medição."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+@contextlib.contextmanager
+def pasta_temporaria():
+    """Executa dentro de uma pasta temporária (as funções gravam a saída no diretório atual)."""
+    pasta_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="split_audio_bench_") as pasta:
+        os.chdir(pasta)
+        try:
+            yield pasta
+        finally:
+            os.chdir(pasta_original)
+
+def medir_uma_vez(arquivo, duracao_segmento_min, modelo, streaming, exportar):
+    """Executa cada etapa uma vez e retorna {etapa: segundos} (None para etapas não executadas)."""
+    tempos = dict.fromkeys(ETAPAS)
+    arquivo = os.path.abspath(arquivo)
+
+    # Decodificação: no modo streaming ela acontece ao consumir o gerador
+    inicio = time.perf_counter()
+    sample_rate, _, _, gerador = split_audio.carregar_segmentos(arquivo, duracao_segmento_min, streaming)
+    if streaming:
+        segmentos = list(gerador)
+        tempos['decodificacao'] = time.perf_counter() - inicio
+    else:
+        tempos['decodificacao'] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        segmentos = list(gerador)
+        tempos['fatiamento'] = time.perf_counter() - inicio
+
+    if exportar:
+        with pasta_temporaria() as pasta, silenciar():
+            inicio = time.perf_counter()
+            for i, segmento in enumerate(segmentos, 1):
+                split_audio.exportar_segmento_m4a(segmento, sample_rate, os.path.join(pasta, f"parte_{i:02d}.m4a"))
+            tempos['exportacao'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for segmento in segmentos:
+        split_audio.transcrever_segmento(modelo, split_audio.preparar_audio_whisper(segmento, sample_rate))
+    tempos['transcricao'] = time.perf_counter() - inicio
+    del segmentos
+
+    if exportar:
+        with pasta_temporaria(), silenciar():
+            inicio = time.perf_counter()
+            sucesso = split_audio.dividir_audio(arquivo, duracao_segmento_min, streaming=streaming)
+            tempos['divisao'] = time.perf_counter() - inicio
+        if not sucesso:
+            raise RuntimeError("dividir_audio falhou")
+
+    with pasta_temporaria(), silenciar():
+        inicio = time.perf_counter()
+        opcoes = split_audio.OpcoesTranscricao(nome_modelo=getattr(modelo, 'name', 'whisper'), streaming=streaming,
+                                               recomecar=True)
+        sucesso = split_audio.dividir_e_transcrever_completa(arquivo, duracao_segmento_min, modelo, opcoes)
+        tempos['transcricao_completa'] = time.perf_counter() - inicio
+    if not sucesso:
+        raise RuntimeError("dividir_e_transcrever_completa falhou")
+
+    return tempos
+
+def executar_benchmark(args):
+    """Gera a fixture, mede as etapas `args.repeticoes` vezes e monta o relatório."""
+    fixture = {'duracao_s': args.duracao, 'sample_rate': args.taxa, 'canais': args.canais,
+               'formato': args.formato, 'semente': args.semente}
+    arquivo = gerar_fixture(args.pasta_fixtures, args.duracao, args.taxa, args.canais, args.formato, args.semente)
+
+    if args.modelo == 'falso':
+        modelo = ModeloFalso()
+    else:
+        with silenciar():
+            modelo = split_audio.carregar_modelo_whisper(args.modelo)
+        if modelo is None:
+            raise RuntimeError(f"Não foi possível carregar o modelo Whisper '{args.modelo}'")
+
+    exportar = shutil.which('ffmpeg') is not None
+    # Aquecimento não medido: os imports preguiçosos (librosa, soundfile...) e a compilação JIT do numba
+    # acontecem na primeira chamada e distorceriam a primeira repetição
+    aquecimento = gerar_fixture(args.pasta_fixtures, DURACAO_AQUECIMENTO_S, args.taxa, args.canais, args.formato,
+                                args.semente)
+    medir_uma_vez(aquecimento, DURACAO_AQUECIMENTO_S / 60, modelo, args.streaming, exportar)
+    medicoes = [medir_uma_vez(arquivo, args.segmentos, modelo, args.streaming, exportar)
+                for _ in range(args.repeticoes)]
+
+    etapas = {}
+    for etapa in ETAPAS:
+        valores = [m[etapa] for m in medicoes if m[etapa] is not None]
+        etapas[etapa] = round(statistics.median(valores), 4) if valores else None
+
+    fator_tempo_real = {etapa: round(segundos / args.duracao, 5)
+                        for etapa, segundos in etapas.items() if segundos is not None}
+    isoladas = [etapas[etapa] for etapa in ETAPAS_ISOLADAS if etapas[etapa] is not None]
+    fator_tempo_real['total'] = round(sum(isoladas) / args.duracao, 5)
+
+    return {
+        'fixture': fixture,
+        'parametros': {'segmentos_min': args.segmentos, 'modelo': args.modelo, 'streaming': args.streaming},
+        'repeticoes': args.repeticoes,
+        'etapas_s': etapas,
+        'fator_tempo_real': fator_tempo_real,
+        'pico_rss_mb': split_audio.obter_pico_rss_mb(),
+        'ffmpeg': exportar,
+        'python': sys.version.split()[0],
+    }
+
+def comparar_com_base(relatorio, base, tolerancia):
+    """
+    Compara o relatório com uma base salva.
+
+    Retorna (comparações, regressões), onde cada comparação é
+    (métrica, base, atual, variação relativa ou None). Uma etapa regride se
+    ficar mais de `tolerancia` mais lenta e a diferença passar de RUIDO_MINIMO_S.
+    """
+    comparacoes = []
+    regressoes = []
+    for etapa in ETAPAS:
+        anterior = base['etapas_s'].get(etapa)
+        atual = relatorio['etapas_s'].get(etapa)
+        if anterior is None or atual is None:
+            continue
+        variacao = (atual - anterior) / anterior if anterior > 0 else None
+        comparacoes.append((etapa, anterior, atual, variacao))
+        if atual > anterior * (1 + tolerancia) and atual - anterior > RUIDO_MINIMO_S:
+            regressoes.append(etapa)
+
+    anterior, atual = base.get('pico_rss_mb'), relatorio.get('pico_rss_mb')
+    if anterior and atual:
+        variacao = (atual - anterior) / anterior
+        comparacoes.append(('pico_rss_mb', anterior, atual, variacao))
+        if variacao > tolerancia:
+            regressoes.append('pico_rss_mb')
+    return comparacoes, regressoes
+
+def imprimir_relatorio(relatorio):
+    """Mostra o relatório em formato legível."""
+    fixture = relatorio['fixture']
+    parametros = relatorio['parametros']
+    print("📏 Benchmark do Split Audio")
+    print("=" * 45)
+    print(f"🎵 Fixture: {fixture['duracao_s']:g}s, {fixture['sample_rate']} Hz, {fixture['canais']} canal(is), "
+          f".{fixture['formato']}")
+    print(f"🔧 Segmentos de {parametros['segmentos_min']:g} min | modelo: {parametros['modelo']} | "
+          f"streaming: {'sim' if parametros['streaming'] else 'não'} | {relatorio['repeticoes']} repetição(ões)")
+    if not relatorio['ffmpeg']:
+        print("⚠️ ffmpeg não encontrado: exportação e divisão não foram medidas")
+    print("\n⏱️ Mediana por etapa (sem o aquecimento, que não é medido):")
+    for etapa in ETAPAS:
+        segundos = relatorio['etapas_s'][etapa]
+        if segundos is None:
+            print(f"   {etapa:<22} -")
+        else:
+            print(f"   {etapa:<22} {segundos:8.3f}s  (RTF {relatorio['fator_tempo_real'][etapa]:.4f})")
+    print(f"\n📊 Fator de tempo real (etapas isoladas): {relatorio['fator_tempo_real']['total']:.4f}")
+    if relatorio['pico_rss_mb'] is not None:
+        print(f"📊 Pico de memória (RSS): {relatorio['pico_rss_mb']:.1f} MB")
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description='Benchmark de divisão e transcrição do split_audio.py')
+    parser.add_argument('--duracao', type=float, default=600, help='Duração da fixture em segundos (padrão: 600)')
+    parser.add_argument('--taxa', type=int, default=44100, help='Taxa de amostragem da fixture (padrão: 44100)')
+    parser.add_argument('--canais', type=int, default=2, help='Número de canais da fixture (padrão: 2)')
+    parser.add_argument('--formato', default='wav', choices=['wav', 'flac', 'ogg'],
+                        help='Formato da fixture (padrão: wav)')
+    parser.add_argument('--semente', type=int, default=0, help='Semente do gerador da fixture (padrão: 0)')
+    parser.add_argument('--pasta-fixtures', default=os.path.join(split_audio.PASTA_CACHE_PADRAO, 'benchmark'),
+                        help='Pasta onde as fixtures geradas são guardadas e reaproveitadas')
+    parser.add_argument('--segmentos', type=float, default=1, help='Duração de cada segmento em minutos (padrão: 1)')
+    parser.add_argument('--modelo', default='falso', choices=['falso'] + split_audio.MODELOS_WHISPER,
+                        help='Modelo de transcrição: "falso" (sem inferência) ou um modelo Whisper já baixado')
+    parser.add_argument('--streaming', action='store_true', help='Medir o modo streaming')
+    parser.add_argument('--repeticoes', type=int, default=3, help='Quantas medições fazer (padrão: 3)')
+    parser.add_argument('--json', action='store_true', help='Imprimir o resultado em JSON')
+    parser.add_argument('--salvar-base', metavar='ARQUIVO', help='Salvar o resultado como base de comparação')
+    parser.add_argument('--comparar', metavar='ARQUIVO', help='Comparar com uma base salva (código 1 se regredir)')
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help='Piora relativa aceita na comparação (padrão: 0.10 = 10%%)')
+    args = parser.parse_args()
+
+    # No modo --json a saída padrão fica reservada para o relatório
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        if not split_audio.verificar_dependencias(split_audio.DEPENDENCIAS_DIVISAO + ['tqdm'], precisa_ffmpeg=False):
+            sys.exit(1)
+
+    relatorio = executar_benchmark(args)
+
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        if base['fixture'] != relatorio['fixture'] or base['parametros'] != relatorio['parametros']:
+            print("❌ A base foi gerada com outra fixture ou outros parâmetros; gere uma nova com --salvar-base",
+                  file=sys.stderr)
+            sys.exit(1)
+        comparacoes, regressoes = comparar_com_base(relatorio, base, args.tolerancia)
+        relatorio['comparacao'] = {
+            'base': args.comparar,
+            'tolerancia': args.tolerancia,
+            'variacoes': {metrica: (round(variacao, 4) if variacao is not None else None)
+                          for metrica, _, _, variacao in comparacoes},
+            'regressoes': regressoes,
+        }
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        imprimir_relatorio(relatorio)
+        if args.comparar:
+            print(f"\n📐 Comparação com {args.comparar} (tolerância {args.tolerancia:.0%}):")
+            for metrica, anterior, atual, variacao in comparacoes:
+                texto_variacao = f"{variacao:+.1%}" if variacao is not None else "-"
+                marcador = "❌" if metrica in regressoes else "✅"
+                print(f"   {marcador} {metrica:<22} {anterior:8.3f} → {atual:8.3f}  ({texto_variacao})")
+            print("✅ Sem regressões" if not regressoes else f"❌ Regressão em: {', '.join(regressoes)}")
+
+    if args.salvar_base:
+        base = {chave: valor for chave, valor in relatorio.items() if chave != 'comparacao'}
+        Path(args.salvar_base).write_text(json.dumps(base, ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
+        if not args.json:
+            print(f"💾 Base salva em: {args.salvar_base}")
+
+    sys.exit(1 if regressoes else 0)
+
+if __name__ == "__main__":
+    main()
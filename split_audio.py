@@ -7,29 +7,120 @@ Usa librosa e soundfile para compatibilidade com Python 3.13.
 
 import os
 import sys
-import numpy as np
+import json
+import math
+import shutil
+import subprocess
+import queue
+import threading
+import time
+import contextlib
+import hashlib
+import glob
+import sqlite3
+import importlib.util
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import deque, defaultdict
+from dataclasses import dataclass, replace
 from pathlib import Path
-import librosa
-import soundfile as sf
-from pydub import AudioSegment
-import whisper
 import argparse
-from tqdm import tqdm
+import signal
+import uuid
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
 
-def verificar_dependencias():
-    """Verifica se as dependências necessárias estão instaladas."""
-    try:
-        import librosa
-        import soundfile
-        from pydub import AudioSegment
-        import whisper
-        from tqdm import tqdm
-        print("✓ librosa, soundfile, pydub, whisper e tqdm estão instalados")
-        return True
-    except ImportError as e:
-        print(f"❌ Dependências não encontradas: {e}")
+try:
+    import resource
+except ImportError:  # Windows: sem medição de pico de memória
+    resource = None
+
+# Bibliotecas pesadas (numpy, librosa, soundfile, pydub, whisper/torch, tqdm) são
+# importadas dentro das funções que as usam, para que uma divisão simples não
+# pague a inicialização do torch/whisper.
+
+# Módulos Python necessários em cada modo (verificados sem importar)
+DEPENDENCIAS_DIVISAO = ['numpy', 'librosa', 'soundfile', 'pydub']
+DEPENDENCIAS_TRANSCRICAO = DEPENDENCIAS_DIVISAO + ['whisper', 'torch', 'tqdm']
+
+# Extensões de áudio reconhecidas (também usadas para listar pastas no modo lote)
+EXTENSOES_VALIDAS = ['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.wma']
+
+# Formatos que o soundfile (libsndfile) consegue ler diretamente em blocos
+EXTENSOES_SOUNDFILE = ['.wav', '.flac', '.ogg', '.aiff', '.aif']
+
+# Taxa de amostragem que o Whisper espera (mono, float32)
+TAXA_WHISPER = 16000
+
+# Análise de energia (VAD): duração de cada quadro e nível abaixo do qual o quadro é silêncio
+DURACAO_QUADRO_VAD = 0.03
+LIMIAR_SILENCIO_DB = -45.0
+
+# Temporários (.tmp) mais antigos que isso vêm de execuções interrompidas e são removidos ao iniciar
+IDADE_TEMPORARIO_ABANDONADO_S = 3600
+
+# Na transcrição, uma sobra final menor que essa fração de um segmento é juntada ao segmento anterior
+FRACAO_CAUDA_MINIMA = 0.25
+
+# Modo --auto: trechos de calibração (curto e longo, para separar o custo fixo de cada
+# chamada ao Whisper do custo por segundo de áudio) e durações de segmento consideradas
+# (múltiplos da janela de 30 s do Whisper, até 10 minutos)
+TRECHOS_CALIBRACAO_S = (10, 60)
+PASSO_SEGMENTO_AUTO_S = 30
+SEGMENTO_MAXIMO_AUTO_S = 600
+
+# Formatos PCM aceitos em --entrada-bruta (formato do ffmpeg -> tipo numpy)
+FORMATOS_PCM_BRUTO = {'s16le': 'int16', 'f32le': 'float32'}
+
+# Modo --ao-vivo: bytes lidos por vez e intervalo entre verificações de um arquivo que ainda cresce
+TAMANHO_LEITURA_AO_VIVO = 64 * 1024
+INTERVALO_ESPERA_AO_VIVO = 0.2
+
+# Modelos Whisper aceitos em --modelo
+MODELOS_WHISPER = ['tiny', 'base', 'small', 'medium', 'large']
+
+# Modos de processamento aceitos pelo modo --servir (ver opcoes_do_modo)
+MODOS_TRABALHO = ['dividir', 'transcrever', 'apenas_transcrever', 'completa', 'copy']
+
+# Opções que um cliente pode enviar junto com um job
+OPCOES_TRABALHO = ['segmentos', 'modelo', 'vad', 'tolerancia_corte', 'limiar_fala', 'streaming', 'recomecar',
+                   'sobreposicao']
+
+# Opções passadas ao Whisper em toda transcrição (também fazem parte da chave do cache)
+OPCOES_WHISPER = {'language': 'pt'}
+
+# Opções do motor em lote (--lote): os resultados diferem do `transcribe`, então a chave do cache também
+OPCOES_WHISPER_LOTE = dict(OPCOES_WHISPER, motor='lote')
+
+# Temperaturas e limiares de nova tentativa do motor em lote (os mesmos padrões do whisper.transcribe)
+TEMPERATURAS_LOTE = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+LIMIAR_COMPRESSAO = 2.4
+LIMIAR_LOGPROB = -1.0
+LIMIAR_SEM_FALA = 0.6
+
+# Local padrão do cache de transcrições
+PASTA_CACHE_PADRAO = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'split_audio')
+
+def verificar_dependencias(modulos=DEPENDENCIAS_TRANSCRICAO, precisa_ffmpeg=True):
+    """
+    Verifica se as dependências necessárias estão instaladas, sem importá-las.
+
+    Usa importlib.util.find_spec, então a checagem não paga o custo de
+    importação do torch/whisper. Retorna True se tudo estiver disponível.
+    """
+    faltando = [modulo for modulo in modulos if importlib.util.find_spec(modulo) is None]
+    if modulos and not faltando:
+        print(f"✓ {', '.join(modulos)} estão instalados")
+    if precisa_ffmpeg and (shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None):
+        print("❌ ffmpeg/ffprobe não encontrados no PATH")
+        return False
+    if faltando:
+        print(f"❌ Dependências não encontradas: {', '.join(faltando)}")
         print("Execute: pip install librosa soundfile pydub openai-whisper torch tqdm")
         return False
+    return True
 
 def criar_pasta_saida(nome_arquivo_original):
     """Cria uma pasta para os arquivos divididos."""
@@ -41,11 +132,966 @@ def criar_pasta_saida(nome_arquivo_original):
         print(f"✓ Pasta criada: {pasta_saida}")
     else:
         print(f"✓ Pasta já existe: {pasta_saida}")
+        limpar_temporarios_abandonados(pasta_saida)
     
     return pasta_saida
 
+def obter_info_audio(arquivo_entrada):
+    """Retorna (taxa de amostragem, duração em segundos) sem decodificar o áudio."""
+    import soundfile as sf
+    if Path(arquivo_entrada).suffix.lower() in EXTENSOES_SOUNDFILE:
+        info = sf.info(arquivo_entrada)
+        return info.samplerate, info.duration
+
+    # Formatos comprimidos: consulta o cabeçalho com ffprobe
+    resultado = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+         '-show_entries', 'stream=sample_rate:format=duration', '-of', 'json', arquivo_entrada],
+        capture_output=True, text=True, check=True
+    )
+    dados = json.loads(resultado.stdout)
+    return int(dados['streams'][0]['sample_rate']), float(dados['format']['duration'])
+
+def ler_blocos_audio(arquivo_entrada, amostras_bloco, sample_rate, sr_alvo=None, relatorio=None):
+    """
+    Lê o arquivo em blocos mono float32 de `amostras_bloco` amostras.
+
+    WAV/FLAC/OGG são lidos com soundfile.blocks; os demais formatos são
+    decodificados por um processo ffmpeg em pipe. Apenas um bloco fica em
+    memória por vez. Com `sr_alvo`, cada bloco já sai reamostrado para essa
+    taxa (e `amostras_bloco` é contado na taxa original). Com `relatorio`, a
+    leitura é somada em 'decodificacao' e a reamostragem em 'reamostragem'
+    (no ffmpeg as duas acontecem juntas e contam como decodificação).
+    """
+    import numpy as np
+    import soundfile as sf
+    import librosa
+    if Path(arquivo_entrada).suffix.lower() in EXTENSOES_SOUNDFILE:
+        blocos = sf.blocks(arquivo_entrada, blocksize=amostras_bloco, dtype='float32', always_2d=True)
+        while True:
+            with medir_etapa(relatorio, 'decodificacao'):
+                bloco = next(blocos, None)
+            if bloco is None:
+                break
+            # Mixagem para mono, como o librosa.load faz por padrão
+            bloco = bloco.mean(axis=1)
+            if sr_alvo is not None and sr_alvo != sample_rate:
+                with medir_etapa(relatorio, 'reamostragem'):
+                    bloco = librosa.resample(bloco, orig_sr=sample_rate, target_sr=sr_alvo)
+            yield bloco
+        return
+
+    # O ffmpeg já entrega o áudio na taxa final, sem reamostragem extra
+    taxa_saida = sr_alvo or sample_rate
+    amostras_bloco = int(round(amostras_bloco * taxa_saida / sample_rate))
+    comando = ['ffmpeg', '-v', 'error', '-i', arquivo_entrada,
+               '-f', 'f32le', '-ac', '1', '-ar', str(taxa_saida), '-']
+    processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        bytes_bloco = amostras_bloco * 4  # float32
+        while True:
+            with medir_etapa(relatorio, 'decodificacao'):
+                dados = processo.stdout.read(bytes_bloco)
+            if not dados:
+                break
+            yield np.frombuffer(dados, dtype=np.float32)
+    finally:
+        processo.stdout.close()
+        if processo.poll() is None:
+            processo.kill()
+        erro = processo.stderr.read().decode(errors='replace').strip()
+        processo.stderr.close()
+        processo.wait()
+
+    if processo.returncode != 0:
+        raise RuntimeError(f"ffmpeg falhou ao decodificar {arquivo_entrada}: {erro}")
+
+def contar_segmentos(total, duracao_segmento, fracao_cauda_minima=0):
+    """
+    Número de segmentos de `duracao_segmento` em `total` (na mesma unidade: segundos ou amostras).
+
+    Uma sobra menor que `fracao_cauda_minima` de um segmento não vira um
+    segmento próprio: ela é juntada ao último. A transcrição usa
+    FRACAO_CAUDA_MINIMA (uma sobra curta ainda custaria uma chamada ao
+    Whisper); a divisão simples mantém os cortes fixos.
+    """
+    num_segmentos = max(1, math.ceil(total / duracao_segmento))
+    if num_segmentos > 1 and total - (num_segmentos - 1) * duracao_segmento < fracao_cauda_minima * duracao_segmento:
+        num_segmentos -= 1
+    return num_segmentos
+
+def calcular_limites_segmentos(duracao_total_segundos, duracao_segmento_min, num_segmentos):
+    """Retorna a lista de (início, fim) em segundos de cada segmento, com cortes fixos (o último vai até o fim)."""
+    duracao_segmento_s = duracao_segmento_min * 60
+    return [(i * duracao_segmento_s,
+             (i + 1) * duracao_segmento_s if i < num_segmentos - 1 else duracao_total_segundos)
+            for i in range(num_segmentos)]
+
+def juntar_cauda_curta(gerador, amostras_minimas):
+    """
+    Repassa os blocos de `gerador`, juntando ao bloco anterior um último bloco com menos de `amostras_minimas`.
+
+    Mantém um bloco de antecedência: só assim se sabe se o próximo é a sobra final.
+    Um bloco final vazio nunca vira segmento, mesmo com `amostras_minimas` zero.
+    """
+    import numpy as np
+    anterior = None
+    for bloco in gerador:
+        if anterior is not None and len(bloco) < max(1, amostras_minimas):
+            # Blocos de tamanho fixo: só o último pode ser menor
+            bloco = np.concatenate([anterior, bloco])
+        elif anterior is not None:
+            yield anterior
+        anterior = bloco
+    if anterior is not None:
+        yield anterior
+
+def calcular_energia_quadros(audio, sample_rate, duracao_quadro_s=DURACAO_QUADRO_VAD):
+    """
+    Energia RMS em dBFS de quadros consecutivos de `duracao_quadro_s`.
+
+    Vetorizado: o áudio é visto como uma matriz (quadros x amostras), sem
+    cópias em float64. Retorna (energia_db, tamanho do quadro em amostras).
+    """
+    import numpy as np
+    tamanho_quadro = max(1, int(duracao_quadro_s * sample_rate))
+    num_quadros = len(audio) // tamanho_quadro
+    if len(audio) == 0:
+        return np.full(1, -200.0), tamanho_quadro
+    if num_quadros == 0:
+        # Trecho menor que um quadro: é tratado como um único quadro
+        tamanho_quadro, num_quadros = len(audio), 1
+    quadros = audio[:num_quadros * tamanho_quadro].reshape(num_quadros, tamanho_quadro)
+    rms = np.sqrt(np.einsum('ij,ij->i', quadros, quadros) / tamanho_quadro)
+    return 20 * np.log10(rms + 1e-10), tamanho_quadro
+
+def ajustar_cortes_silencio(energia_db, tamanho_quadro, cortes, tolerancia_amostras):
+    """
+    Move cada ponto de corte para o quadro de menor energia dentro de ±`tolerancia_amostras`.
+
+    Entre quadros praticamente tão silenciosos quanto o mínimo (até 1 dB
+    acima), escolhe o mais próximo do corte original. A tolerância é limitada
+    a menos da metade da distância entre cortes, então as buscas de cortes
+    vizinhos não se cruzam e os cortes retornados são estritamente crescentes.
+    """
+    import numpy as np
+    raio = max(1, tolerancia_amostras // tamanho_quadro)
+    # Distância (em quadros) entre cortes consecutivos, contando o início do áudio
+    espacamento = min(b - a for a, b in zip([0] + cortes, cortes)) // tamanho_quadro if cortes else 0
+    raio = max(0, min(raio, (espacamento - 1) // 2))
+    ajustados = []
+    for corte in cortes:
+        centro = corte // tamanho_quadro
+        inicio = max(0, centro - raio)
+        fim = min(len(energia_db), centro + raio + 1)
+        if fim <= inicio:
+            novo_corte = corte
+        else:
+            janela = energia_db[inicio:fim]
+            candidatos = inicio + np.flatnonzero(janela <= janela.min() + 1.0)
+            melhor = candidatos[np.argmin(np.abs(candidatos - centro))]
+            novo_corte = int(melhor * tamanho_quadro + tamanho_quadro // 2)
+        if ajustados and novo_corte <= ajustados[-1]:
+            # Só com cortes a menos de um quadro de distância: o corte é descartado
+            continue
+        ajustados.append(novo_corte)
+    return ajustados
+
+def proporcao_fala(segmento, sample_rate, limiar_db=LIMIAR_SILENCIO_DB):
+    """Fração dos quadros do segmento com energia acima de `limiar_db` (dBFS)."""
+    import numpy as np
+    energia_db, _ = calcular_energia_quadros(segmento, sample_rate)
+    return float(np.mean(energia_db > limiar_db))
+
+def imprimir_info_vad(streaming, tolerancia_corte_s, limiar_fala):
+    """Mostra como a análise de energia será aplicada."""
+    if streaming:
+        print("🔇 VAD: no modo streaming os cortes ficam fixos; apenas segmentos sem fala são pulados")
+    else:
+        print(f"🔇 VAD: cortes ajustados para a pausa mais próxima (±{tolerancia_corte_s:g}s)")
+    print(f"🔇 VAD: segmentos com menos de {limiar_fala:.0%} de fala não são transcritos")
+
+def calcular_fronteiras_segmentos(audio_data, sample_rate, duracao_segmento_min, tolerancia_corte_s=None,
+                                  fracao_cauda_minima=0):
+    """
+    Limites (início, fim) em amostras de cada segmento de `audio_data`.
+
+    Com `tolerancia_corte_s`, cada corte é movido para o trecho mais
+    silencioso dentro dessa tolerância (análise de energia sobre o array).
+    `fracao_cauda_minima` é repassada a `contar_segmentos`.
+    """
+    duracao_segmento_amostras = int(duracao_segmento_min * 60 * sample_rate)
+    total_amostras = len(audio_data)
+
+    num_segmentos = contar_segmentos(total_amostras, duracao_segmento_amostras, fracao_cauda_minima)
+    cortes = [i * duracao_segmento_amostras for i in range(1, num_segmentos)]
+    if tolerancia_corte_s and cortes:
+        # Análise de energia sobre o array já carregado: cortes caem em pausas, não no meio de palavras
+        energia_db, tamanho_quadro = calcular_energia_quadros(audio_data, sample_rate)
+        cortes = ajustar_cortes_silencio(energia_db, tamanho_quadro, cortes,
+                                         int(tolerancia_corte_s * sample_rate))
+
+    fronteiras = [0] + cortes + [total_amostras]
+    return list(zip(fronteiras[:-1], fronteiras[1:]))
+
+def janelas_com_sobreposicao(gerador, amostras_margem):
+    """
+    Estende cada segmento com `amostras_margem` amostras do vizinho anterior e do seguinte.
+
+    Gera (janela, amostras antes do segmento, amostras do segmento). O
+    segmento seguinte é lido antes de a janela atual ser entregue, então no
+    máximo três segmentos ficam em memória (inclusive no modo streaming).
+    Sem margem, os segmentos passam sem cópia.
+    """
+    import numpy as np
+    if amostras_margem <= 0:
+        for segmento in gerador:
+            yield segmento, 0, len(segmento)
+        return
+
+    def montar(anterior, atual, proximo):
+        antes = anterior[-amostras_margem:] if anterior is not None else atual[:0]
+        depois = proximo[:amostras_margem] if proximo is not None else atual[:0]
+        return np.concatenate([antes, atual, depois]), len(antes), len(atual)
+
+    anterior = atual = None
+    for proximo in gerador:
+        if atual is not None:
+            yield montar(anterior, atual, proximo)
+        anterior, atual = atual, proximo
+    if atual is not None:
+        yield montar(anterior, atual, None)
+
+def carregar_segmentos(arquivo_entrada, duracao_segmento_min=4, streaming=False, sr_alvo=None,
+                       tolerancia_corte_s=None, armazem_pcm=None, relatorio=None, fracao_cauda_minima=0):
+    """
+    Prepara a leitura do arquivo em segmentos.
+
+    Retorna (sample_rate, duração total em segundos, limites, gerador), onde
+    `limites` é a lista de (início, fim) em segundos de cada segmento e o
+    gerador produz um array numpy por segmento. No modo streaming o arquivo
+    nunca é carregado inteiro: cada segmento é decodificado quando consumido
+    (e os limites são estimados pelo cabeçalho). Com `sr_alvo`, o áudio é
+    reamostrado uma única vez, na decodificação, e o `sample_rate` retornado
+    passa a ser `sr_alvo`. Com `tolerancia_corte_s` (fora do streaming), cada
+    corte é movido para o trecho mais silencioso dentro dessa tolerância.
+    Com `armazem_pcm` (ver ArmazemPCM), o áudio decodificado vem do PCM em
+    disco e os segmentos são views mapeadas em memória, sem cópia; o modo
+    streaming é dispensado, já que a decodificação em blocos acontece ali.
+    Com `relatorio`, o carregamento do arquivo inteiro ('carregamento'), a
+    decodificação em blocos ('decodificacao') e a reamostragem para
+    `sr_alvo` ('reamostragem') são medidos em separado, onde acontecem.
+    Uma sobra final menor que `fracao_cauda_minima` de um segmento é juntada
+    ao anterior (ver `contar_segmentos`).
+    """
+    import librosa
+    if armazem_pcm is not None:
+        audio_data, sample_rate = armazem_pcm.obter(arquivo_entrada, sr_alvo, relatorio)
+        limites_amostras = calcular_fronteiras_segmentos(audio_data, sample_rate, duracao_segmento_min,
+                                                         tolerancia_corte_s, fracao_cauda_minima)
+        gerador = (audio_data[inicio:fim] for inicio, fim in limites_amostras)
+        limites = [(inicio / sample_rate, fim / sample_rate) for inicio, fim in limites_amostras]
+        return sample_rate, len(audio_data) / sample_rate, limites, gerador
+
+    if streaming:
+        sample_rate_original, duracao_total_segundos = obter_info_audio(arquivo_entrada)
+        sample_rate = sr_alvo or sample_rate_original
+        duracao_segmento_amostras = int(duracao_segmento_min * 60 * sample_rate)
+        gerador = juntar_cauda_curta(
+            ler_blocos_audio(arquivo_entrada, int(duracao_segmento_min * 60 * sample_rate_original),
+                             sample_rate_original, sr_alvo, relatorio),
+            fracao_cauda_minima * duracao_segmento_amostras)
+        total_amostras = int(round(duracao_total_segundos * sample_rate))
+        num_segmentos = contar_segmentos(total_amostras, duracao_segmento_amostras, fracao_cauda_minima)
+        limites = calcular_limites_segmentos(duracao_total_segundos, duracao_segmento_min, num_segmentos)
+        return sample_rate, duracao_total_segundos, limites, gerador
+
+    # Mesmo caminho do librosa.load(sr=sr_alvo), que também decodifica na taxa original e depois reamostra,
+    # mas com as duas etapas medidas separadamente
+    with medir_etapa(relatorio, 'carregamento'):
+        audio_data, sample_rate = librosa.load(arquivo_entrada, sr=None)
+    if sr_alvo is not None and sr_alvo != sample_rate:
+        with medir_etapa(relatorio, 'reamostragem'):
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=sr_alvo)
+        sample_rate = sr_alvo
+    duracao_total_segundos = len(audio_data) / sample_rate
+    limites_amostras = calcular_fronteiras_segmentos(audio_data, sample_rate, duracao_segmento_min,
+                                                     tolerancia_corte_s, fracao_cauda_minima)
+    gerador = (audio_data[inicio:fim] for inicio, fim in limites_amostras)
+    limites = [(inicio / sample_rate, fim / sample_rate) for inicio, fim in limites_amostras]
+    return sample_rate, duracao_total_segundos, limites, gerador
+
+class ArmazemPCM:
+    """
+    Áudio decodificado guardado em disco e mapeado em memória (--pcm-em-disco).
+
+    Cada arquivo é decodificado uma única vez por taxa de amostragem, em
+    blocos (memória constante), para um arquivo float32 mono cru com um
+    `.json` ao lado (taxa e número de amostras). Os estágios recebem views
+    np.memmap desse arquivo, sem cópias, e os processos trabalhadores recebem
+    só o caminho e os deslocamentos de cada segmento. A chave usa o caminho,
+    o tamanho e a data de modificação do arquivo de entrada (não a duração dos
+    segmentos), então novas execuções reaproveitam a decodificação. Os
+    arquivos usados há mais tempo são removidos quando a pasta passa do limite.
+    """
+
+    def __init__(self, pasta=os.path.join(PASTA_CACHE_PADRAO, 'pcm'), tamanho_max_mb=4096):
+        os.makedirs(pasta, exist_ok=True)
+        limpar_temporarios_abandonados(pasta)
+        self.pasta = pasta
+        self.tamanho_max = int(tamanho_max_mb * 1024 * 1024)
+
+    def caminho(self, arquivo_entrada, sr_alvo=None):
+        """Caminho do PCM de `arquivo_entrada` na taxa `sr_alvo` (None = taxa original)."""
+        info = os.stat(arquivo_entrada)
+        identidade = f"{os.path.realpath(arquivo_entrada)}|{info.st_size}|{info.st_mtime_ns}|{sr_alvo or 'original'}"
+        chave = hashlib.sha256(identidade.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.pasta, f"{Path(arquivo_entrada).stem}_{chave}.f32")
+
+    def obter(self, arquivo_entrada, sr_alvo=None, relatorio=None):
+        """Retorna (áudio mapeado em memória, sample_rate), decodificando o arquivo se necessário."""
+        import numpy as np
+        caminho = self.caminho(arquivo_entrada, sr_alvo)
+        metadados = self._ler_metadados(caminho)
+        if metadados is None:
+            print(f"💽 Decodificando para o PCM em disco: {caminho}")
+            metadados = self._decodificar(arquivo_entrada, caminho, sr_alvo, relatorio)
+            self._despejar(manter=caminho)
+        else:
+            print(f"💽 Reaproveitando o PCM em disco: {caminho}")
+            os.utime(caminho)  # marca como usado recentemente
+        if metadados['amostras'] == 0:
+            return np.zeros(0, dtype=np.float32), metadados['sample_rate']
+        # Cópia na escrita: views graváveis para o Whisper, sem alterar o arquivo
+        return np.memmap(caminho, dtype=np.float32, mode='c'), metadados['sample_rate']
+
+    def _ler_metadados(self, caminho):
+        try:
+            with open(caminho + '.json', 'r', encoding='utf-8') as f:
+                metadados = json.load(f)
+            if os.path.getsize(caminho) == metadados['amostras'] * 4:
+                return metadados
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def _decodificar(self, arquivo_entrada, caminho, sr_alvo, relatorio=None):
+        sample_rate_original, _ = obter_info_audio(arquivo_entrada)
+        sample_rate = sr_alvo or sample_rate_original
+        amostras = 0
+        temporario = caminho_temporario(caminho)
+        try:
+            with open(temporario, 'xb') as f:
+                for bloco in ler_blocos_audio(arquivo_entrada, 60 * sample_rate_original, sample_rate_original,
+                                              sr_alvo, relatorio):
+                    f.write(bloco.astype('<f4', copy=False).tobytes())
+                    amostras += len(bloco)
+            os.replace(temporario, caminho)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temporario)
+            raise
+        metadados = {'arquivo': os.path.realpath(arquivo_entrada), 'sample_rate': sample_rate, 'amostras': amostras}
+        _escrever_atomicamente(caminho + '.json', json.dumps(metadados, ensure_ascii=False))
+        return metadados
+
+    def _despejar(self, manter):
+        """Remove os PCMs usados há mais tempo até a pasta caber no limite (nunca `manter`)."""
+        arquivos = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith('.f32'):
+                caminho = os.path.join(self.pasta, nome)
+                info = os.stat(caminho)
+                arquivos.append((info.st_mtime, info.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.tamanho_max:
+                break
+            if caminho == manter:
+                continue
+            for arquivo in (caminho, caminho + '.json'):
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+            total -= tamanho
+
+def preparar_audio_whisper(audio, sample_rate):
+    """Converte um array para o formato do Whisper: mono, float32, 16 kHz, contíguo e gravável."""
+    import numpy as np
+    import librosa
+    if sample_rate != TAXA_WHISPER:
+        audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=TAXA_WHISPER)
+    return np.require(audio, dtype=np.float32, requirements=['C', 'W'])
+
+def carregar_audio_whisper(arquivo_audio):
+    """Decodifica um arquivo inteiro diretamente em 16 kHz mono para o Whisper."""
+    import librosa
+    audio_data, _ = librosa.load(arquivo_audio, sr=TAXA_WHISPER)
+    if arquivo_audio.lower().endswith('.m4a'):
+        # Ajusta a normalização para valores similares ao arquivo WAV original
+        if audio_data.max() > 0.7:  # Se está muito normalizado
+            audio_data = audio_data * 0.6  # Reduz para valores similares ao WAV
+    return preparar_audio_whisper(audio_data, TAXA_WHISPER)
+
+def transcrever_segmento(modelo_whisper, audio, lote_whisper=None):
+    """
+    Executa o Whisper sobre um array 16 kHz já em memória e retorna o resultado bruto.
+
+    Com `lote_whisper`, usa o motor em lote (ver `transcrever_em_lote`) no lugar do `transcribe`.
+    """
+    if lote_whisper:
+        return transcrever_em_lote(modelo_whisper, [audio], lote_whisper)[0]
+    return modelo_whisper.transcribe(audio, **OPCOES_WHISPER)
+
+class CacheTranscricoes:
+    """
+    Cache em disco (SQLite) de transcrições, endereçado pelo conteúdo do áudio.
+
+    A chave é o SHA-256 das amostras decodificadas (16 kHz float32) somado ao
+    nome do modelo e às opções do Whisper, então o mesmo trecho de áudio é
+    reaproveitado entre reenvios, execuções com outro `--segmentos` ou
+    vinhetas repetidas. O tamanho total é limitado e as entradas menos usadas
+    recentemente são descartadas primeiro (LRU).
+    """
+
+    def __init__(self, pasta=PASTA_CACHE_PADRAO, tamanho_max_mb=512):
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho = os.path.join(pasta, 'transcricoes.sqlite')
+        self.tamanho_max = int(tamanho_max_mb * 1024 * 1024)
+        self.acertos = 0
+        self.falhas = 0
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS transcricoes ("
+            "chave TEXT PRIMARY KEY, resultado TEXT NOT NULL, "
+            "tamanho INTEGER NOT NULL, ultimo_acesso REAL NOT NULL)")
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON transcricoes (ultimo_acesso)")
+        self._conexao.commit()
+        self._total = self._somar_tamanhos()
+
+    @staticmethod
+    def gerar_chave(audio, nome_modelo, opcoes=OPCOES_WHISPER):
+        """Chave do cache: hash das amostras + modelo + opções."""
+        import numpy as np
+        sha = hashlib.sha256(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+        sha.update(json.dumps({'modelo': nome_modelo, 'opcoes': opcoes}, sort_keys=True).encode())
+        return sha.hexdigest()
+
+    def obter(self, chave):
+        """Retorna o resultado guardado ou None, atualizando o contador de acertos/falhas."""
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT resultado FROM transcricoes WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+            self._conexao.execute(
+                "UPDATE transcricoes SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+            self._conexao.commit()
+            return json.loads(linha[0])
+
+    def guardar(self, chave, resultado):
+        """Guarda o texto e os trechos com tempo do resultado do Whisper e aplica o limite de tamanho."""
+        compacto = {
+            'text': resultado['text'],
+            'segments': [{'start': trecho['start'], 'end': trecho['end'], 'text': trecho['text']}
+                         for trecho in resultado.get('segments', [])],
+        }
+        dados = json.dumps(compacto, ensure_ascii=False)
+        tamanho = len(dados.encode())
+        with self._trava:
+            anterior = self._conexao.execute(
+                "SELECT tamanho FROM transcricoes WHERE chave = ?", (chave,)).fetchone()
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO transcricoes (chave, resultado, tamanho, ultimo_acesso) "
+                "VALUES (?, ?, ?, ?)", (chave, dados, tamanho, time.time()))
+            self._total += tamanho - (anterior[0] if anterior else 0)
+            if self._total > self.tamanho_max:
+                self._despejar()
+            self._conexao.commit()
+
+    def _somar_tamanhos(self):
+        return self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM transcricoes").fetchone()[0]
+
+    def _despejar(self):
+        """Remove as entradas menos usadas recentemente até caber no limite."""
+        # O total mantido em memória não vê o que outra execução gravou no mesmo arquivo:
+        # como o despejo é raro, a soma completa só é refeita aqui
+        self._total = self._somar_tamanhos()
+        if self._total <= self.tamanho_max:
+            return
+        for chave, tamanho in self._conexao.execute(
+                "SELECT chave, tamanho FROM transcricoes ORDER BY ultimo_acesso ASC").fetchall():
+            self._conexao.execute("DELETE FROM transcricoes WHERE chave = ?", (chave,))
+            self._total -= tamanho
+            if self._total <= self.tamanho_max:
+                break
+
+    def resumo(self):
+        """Texto curto com os contadores de acertos e falhas."""
+        consultas = self.acertos + self.falhas
+        taxa = (self.acertos / consultas * 100) if consultas else 0.0
+        return f"💾 Cache: {self.acertos} acertos, {self.falhas} falhas ({taxa:.0f}% de acerto)"
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+def transcrever_com_cache(modelo_whisper, audio, nome_modelo, cache=None):
+    """Consulta o cache antes de rodar o Whisper; guarda o resultado em caso de falha."""
+    if cache is None:
+        return transcrever_segmento(modelo_whisper, audio)
+    chave = cache.gerar_chave(audio, nome_modelo)
+    resultado = cache.obter(chave)
+    if resultado is None:
+        resultado = transcrever_segmento(modelo_whisper, audio)
+        cache.guardar(chave, resultado)
+    return resultado
+
+def _mel_em_lote(janelas, modelo_whisper):
+    """
+    Espectrogramas log-mel de várias janelas de até 30 s em uma única STFT vetorizada.
+
+    Mesmo cálculo do whisper.log_mel_spectrogram sobre cada janela completada
+    com zeros até 30 s, mas com o piso de 80 dB calculado por janela: aplicado
+    ao lote inteiro, o whisper usaria o máximo de todas as janelas juntas.
+    """
+    import numpy as np
+    import torch
+    from whisper.audio import N_FFT, HOP_LENGTH, N_SAMPLES, mel_filters
+    audio = np.zeros((len(janelas), N_SAMPLES), dtype=np.float32)
+    for i, janela in enumerate(janelas):
+        audio[i, :len(janela)] = janela
+    audio = torch.from_numpy(audio).to(modelo_whisper.device)
+    stft = torch.stft(audio, N_FFT, HOP_LENGTH, window=torch.hann_window(N_FFT).to(audio.device),
+                      return_complex=True)
+    mel = mel_filters(audio.device, modelo_whisper.dims.n_mels) @ (stft[..., :-1].abs() ** 2)
+    log_mel = torch.clamp(mel, min=1e-10).log10()
+    log_mel = torch.maximum(log_mel, log_mel.amax(dim=(1, 2), keepdim=True) - 8.0)
+    return (log_mel + 4.0) / 4.0
+
+def _decodificar_com_nova_tentativa(modelo_whisper, mel):
+    """
+    Decodifica um lote de espectrogramas com whisper.decode.
+
+    Como no `transcribe`, janelas repetitivas demais ou pouco prováveis são
+    decodificadas de novo, com temperaturas maiores, e só elas formam o lote
+    da nova tentativa.
+    """
+    import whisper
+    resultados = [None] * len(mel)
+    pendentes = list(range(len(mel)))
+    fp16 = modelo_whisper.device.type == 'cuda'
+    for temperatura in TEMPERATURAS_LOTE:
+        opcoes = whisper.DecodingOptions(**OPCOES_WHISPER, temperature=temperatura, fp16=fp16)
+        decodificados = whisper.decode(modelo_whisper, mel[pendentes], opcoes)
+        falhas = []
+        for indice, resultado in zip(pendentes, decodificados):
+            resultados[indice] = resultado
+            sem_fala = resultado.no_speech_prob > LIMIAR_SEM_FALA and resultado.avg_logprob < LIMIAR_LOGPROB
+            if not sem_fala and (resultado.compression_ratio > LIMIAR_COMPRESSAO
+                                 or resultado.avg_logprob < LIMIAR_LOGPROB):
+                falhas.append(indice)
+        pendentes = falhas
+        if not pendentes:
+            break
+    return resultados
+
+def _trechos_dos_tokens(resultado, tokenizador, inicio_s, duracao_s):
+    """Converte os tokens de uma janela decodificada em trechos (start, end, text) com tempos a partir de `inicio_s`."""
+    # Cada token de tempo vale 20 ms (dois quadros do espectrograma)
+    precisao_s = 0.02
+    trechos = []
+    texto = []
+    inicio_trecho = 0.0
+
+    def fechar(fim_trecho):
+        conteudo = tokenizador.decode(texto).strip()
+        if conteudo:
+            trechos.append({'start': round(inicio_s + min(inicio_trecho, duracao_s), 2),
+                            'end': round(inicio_s + min(fim_trecho, duracao_s), 2),
+                            'text': ' ' + conteudo, 'temperature': resultado.temperature,
+                            'avg_logprob': resultado.avg_logprob,
+                            'compression_ratio': resultado.compression_ratio,
+                            'no_speech_prob': resultado.no_speech_prob})
+
+    for token in resultado.tokens:
+        if token >= tokenizador.timestamp_begin:
+            tempo = (token - tokenizador.timestamp_begin) * precisao_s
+            if texto:
+                fechar(tempo)
+                texto = []
+            inicio_trecho = tempo
+        elif token < tokenizador.eot:
+            texto.append(token)
+    if texto:
+        fechar(duracao_s)
+    return trechos
+
+def transcrever_em_lote(modelo_whisper, audios, tamanho_lote=8):
+    """
+    Transcreve vários áudios 16 kHz agrupando as janelas de 30 s de todos eles em lotes.
+
+    Cada áudio é cortado em janelas fixas de 30 s; os espectrogramas de
+    `tamanho_lote` janelas (de um ou mais áudios) são calculados juntos e
+    decodificados em uma única passada do modelo. Diferente do `transcribe`,
+    as janelas não recebem o texto anterior como contexto. Retorna, para
+    cada áudio, um resultado no formato do `transcribe` (text, segments,
+    language), com tempos relativos ao início do áudio.
+    """
+    import whisper
+    from whisper.audio import N_SAMPLES
+    tokenizador = whisper.tokenizer.get_tokenizer(modelo_whisper.is_multilingual,
+                                                  num_languages=modelo_whisper.num_languages,
+                                                  language=OPCOES_WHISPER.get('language'), task='transcribe')
+    # (índice do áudio, início em segundos, janela)
+    janelas = [(indice, inicio / TAXA_WHISPER, audio[inicio:inicio + N_SAMPLES])
+               for indice, audio in enumerate(audios) for inicio in range(0, len(audio), N_SAMPLES)]
+    trechos_por_audio = [[] for _ in audios]
+    for inicio_lote in range(0, len(janelas), tamanho_lote):
+        lote = janelas[inicio_lote:inicio_lote + tamanho_lote]
+        mel = _mel_em_lote([janela for _, _, janela in lote], modelo_whisper)
+        for (indice, inicio_s, janela), resultado in zip(lote, _decodificar_com_nova_tentativa(modelo_whisper, mel)):
+            if resultado.no_speech_prob > LIMIAR_SEM_FALA and resultado.avg_logprob <= LIMIAR_LOGPROB:
+                continue  # janela sem fala
+            trechos_por_audio[indice].extend(
+                _trechos_dos_tokens(resultado, tokenizador, inicio_s, len(janela) / TAXA_WHISPER))
+
+    resultados = []
+    for trechos in trechos_por_audio:
+        for numero, trecho in enumerate(trechos):
+            trecho['id'] = numero
+        resultados.append({'text': ''.join(trecho['text'] for trecho in trechos), 'segments': trechos,
+                           'language': OPCOES_WHISPER.get('language')})
+    return resultados
+
+def contar_janelas_whisper(audio):
+    """Número de janelas de 30 s que o motor em lote usa para `audio` (16 kHz)."""
+    return max(1, math.ceil(len(audio) / (30 * TAXA_WHISPER)))
+
+def exportar_segmento_m4a(segmento, sample_rate, caminho_saida):
+    """Converte um segmento numpy para AudioSegment e salva como M4A."""
+    import numpy as np
+    from pydub import AudioSegment
+    # Primeiro, normalizar o áudio para o formato correto
+    if segmento.dtype != np.float32:
+        segmento = segmento.astype(np.float32)
+    
+    # Converter para AudioSegment
+    audio_segment = AudioSegment(
+        segmento.tobytes(),
+        frame_rate=sample_rate,
+        sample_width=4,  # 32-bit float
+        channels=1 if len(segmento.shape) == 1 else segmento.shape[1]
+    )
+    
+    # Salvar como M4A
+    audio_segment.export(caminho_saida, format="mp4")
+
+def _exportar_no_trabalhador(nome_memoria, forma, tipo, sample_rate, caminho_saida):
+    """Executado dentro do processo trabalhador: exporta o segmento lido da memória compartilhada."""
+    import numpy as np
+    # Os processos do pool (spawn) compartilham o resource_tracker do processo
+    # principal, que cria e remove o bloco; aqui ele só é anexado
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    segmento = None
+    try:
+        segmento = np.ndarray(forma, dtype=tipo, buffer=memoria.buf)
+        exportar_segmento_m4a(segmento, sample_rate, caminho_saida)
+    finally:
+        del segmento  # a view precisa ser liberada antes de fechar o bloco
+        memoria.close()
+
+def _exportar_trecho_no_trabalhador(caminho_pcm, inicio, fim, sample_rate, caminho_saida):
+    """Executado dentro do processo trabalhador: exporta um trecho lido direto do PCM em disco."""
+    exportar_segmento_m4a(_abrir_pcm_no_trabalhador(caminho_pcm)[inicio:fim], sample_rate, caminho_saida)
+
+def criar_pool_exportacao(jobs):
+    """Pool de `jobs` processos para exportar segmentos M4A (--jobs), reaproveitado entre arquivos no modo lote."""
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn'))
+
+def exportar_em_processo(pool, segmento, sample_rate, caminho_saida):
+    """
+    Exporta `segmento` em um processo do `pool`, sem serializar as amostras.
+
+    O segmento é copiado uma única vez para um bloco de memória compartilhada;
+    o trabalhador recebe apenas o nome do bloco, a forma e o tipo, e monta uma
+    view numpy sobre ele. O bloco é removido assim que a exportação termina.
+    """
+    import numpy as np
+    segmento = np.ascontiguousarray(segmento, dtype=np.float32)
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, segmento.nbytes))
+    try:
+        np.ndarray(segmento.shape, dtype=segmento.dtype, buffer=memoria.buf)[...] = segmento
+        futuro = pool.submit(_exportar_no_trabalhador, memoria.name, segmento.shape, segmento.dtype.str,
+                             sample_rate, caminho_saida)
+        futuro.result()
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+def pre_carregar(gerador, tamanho_fila=2, tempos=None):
+    """
+    Consome `gerador` em uma thread separada e entrega os itens por uma fila limitada.
+
+    A fila limitada aplica contrapressão: o produtor para quando está
+    `tamanho_fila` itens à frente do consumidor. Se `tempos` for informado,
+    o tempo gasto produzindo os itens é somado em tempos['decodificacao'].
+    Exceções do produtor são relançadas no consumidor.
+    """
+    fila = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+
+    def enfileirar(item):
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produtor():
+        iterador = iter(gerador)
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    break
+                if tempos is not None:
+                    tempos['decodificacao'] += time.perf_counter() - inicio
+                if not enfileirar((False, item)):
+                    return
+        except Exception as e:
+            enfileirar((True, e))
+            return
+        enfileirar((True, None))
+
+    thread = threading.Thread(target=produtor, name="decodificador", daemon=True)
+    thread.start()
+    try:
+        while True:
+            fim, item = fila.get()
+            if fim:
+                if item is not None:
+                    raise item
+                break
+            yield item
+    finally:
+        parar.set()
+
+def executar_pipeline(gerador, exportar=None, transcrever=None, ao_concluir=None,
+                      tamanho_fila=2, trabalhadores_export=2):
+    """
+    Executa decodificação, exportação e transcrição como estágios sobrepostos.
+
+    - decodificação: thread produtora alimentando uma fila limitada (`pre_carregar`)
+    - exportação: pool de threads chamando `exportar(indice, segmento)`
+    - transcrição: thread atual chamando `transcrever(indice, segmento)`
+
+    O modelo Whisper fica em uma única thread; a exportação (ffmpeg) roda em
+    paralelo a ela. No máximo `trabalhadores_export` exportações ficam
+    pendentes antes de a transcrição esperar, o que limita a memória.
+    `ao_concluir(indice, segmento, resultado_export, resultado_transcricao)` é
+    chamado na ordem dos segmentos. Retorna os tempos por etapa em segundos.
+    """
+    tempos = {'decodificacao': 0.0, 'exportacao': 0.0, 'transcricao': 0.0, 'total': 0.0}
+    trava = threading.Lock()
+    inicio_total = time.perf_counter()
+
+    def exportar_medido(indice, segmento):
+        inicio = time.perf_counter()
+        try:
+            return exportar(indice, segmento)
+        finally:
+            with trava:
+                tempos['exportacao'] += time.perf_counter() - inicio
+
+    # Coletor ordenado: indice -> (segmento, futuro da exportação, resultado da transcrição)
+    pendentes = {}
+    proximo = 0
+
+    def coletar(limite):
+        """Entrega em ordem os segmentos prontos; espera enquanto houver mais que `limite` pendentes."""
+        nonlocal proximo
+        while proximo in pendentes:
+            segmento, futuro, transcricao = pendentes[proximo]
+            if futuro is not None and not futuro.done() and len(pendentes) <= limite:
+                break
+            resultado_export = futuro.result() if futuro is not None else None
+            del pendentes[proximo]
+            if ao_concluir is not None:
+                ao_concluir(proximo, segmento, resultado_export, transcricao)
+            proximo += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, trabalhadores_export), thread_name_prefix="exportador") as pool:
+        for indice, segmento in enumerate(pre_carregar(gerador, tamanho_fila, tempos)):
+            futuro = pool.submit(exportar_medido, indice, segmento) if exportar is not None else None
+
+            transcricao = None
+            if transcrever is not None:
+                inicio = time.perf_counter()
+                transcricao = transcrever(indice, segmento)
+                tempos['transcricao'] += time.perf_counter() - inicio
+
+            pendentes[indice] = (segmento, futuro, transcricao)
+            coletar(limite=max(1, trabalhadores_export))
+
+        coletar(limite=0)
+
+    tempos['total'] = time.perf_counter() - inicio_total
+    return tempos
+
+def imprimir_tempos_etapas(tempos):
+    """Mostra o tempo acumulado de cada etapa do pipeline."""
+    print(f"⏱️ Decodificação: {tempos['decodificacao']:.1f}s | "
+          f"Exportação: {tempos['exportacao']:.1f}s | "
+          f"Transcrição: {tempos['transcricao']:.1f}s | "
+          f"Total (relógio): {tempos['total']:.1f}s")
+
+def obter_pico_rss_mb(filhos=False):
+    """Pico de memória residente em MB deste processo (ou dos processos filhos já encerrados)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def estatisticas_latencia(valores):
+    """Média, mediana, p95 e máximo de uma sequência de latências em segundos (None se vazia)."""
+    latencias = sorted(valores)
+    if not latencias:
+        return None
+    return {
+        'media': round(sum(latencias) / len(latencias), 4),
+        'mediana': round(latencias[len(latencias) // 2], 4),
+        'p95': round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))], 4),
+        'max': round(latencias[-1], 4),
+    }
+
+class RelatorioExecucao:
+    """
+    Instrumentação de uma execução (--relatorio).
+
+    Acumula o tempo de cada etapa (carregamento, decodificação, reamostragem,
+    exportação, transcrição, escrita...), a latência de cada segmento, o pico
+    de memória e o tempo de carregamento do modelo. `medir(etapa)` pode ser
+    usado de várias threads. O relatório é salvo em JSON lines: um registro
+    por segmento e um registro final de resumo.
+    """
+
+    def __init__(self, arquivo_entrada, modo, nome_modelo=None, carregamento_modelo_s=None):
+        self.arquivo_entrada = str(arquivo_entrada)
+        self.modo = modo
+        self.nome_modelo = nome_modelo
+        self.carregamento_modelo_s = carregamento_modelo_s
+        self.duracao_audio_s = None
+        self.etapas = defaultdict(float)
+        self.chamadas = defaultdict(int)
+        self.segmentos = []
+        # Campos adicionais do resumo, preenchidos por modos específicos (ex.: atraso do --ao-vivo)
+        self.extras = {}
+        self.trava = threading.Lock()
+        self.iniciado_em = time.time()
+        self.inicio = time.perf_counter()
+
+    @contextlib.contextmanager
+    def medir(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.somar(etapa, time.perf_counter() - inicio)
+
+    def somar(self, etapa, segundos, chamadas=1):
+        with self.trava:
+            self.etapas[etapa] += segundos
+            self.chamadas[etapa] += chamadas
+
+    def registrar_segmento(self, numero, duracao_audio_s, latencia_s, **extras):
+        with self.trava:
+            self.segmentos.append({'tipo': 'segmento', 'numero': numero,
+                                   'duracao_audio_s': round(duracao_audio_s, 3),
+                                   'latencia_s': round(latencia_s, 4), **extras})
+
+    def anotar_segmento(self, numero, **extras):
+        """Acrescenta campos ao registro já existente do segmento `numero`."""
+        with self.trava:
+            for registro in self.segmentos:
+                if registro['numero'] == numero:
+                    registro.update(extras)
+
+    def resumo(self, sucesso):
+        """Registro final: totais, vazão (segundos de áudio por segundo de relógio) e memória."""
+        tempo_total = time.perf_counter() - self.inicio
+        return {
+            'tipo': 'resumo',
+            'arquivo': self.arquivo_entrada,
+            'modo': self.modo,
+            'modelo': self.nome_modelo,
+            'sucesso': bool(sucesso),
+            'iniciado_em': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.iniciado_em)),
+            'duracao_audio_s': round(self.duracao_audio_s, 3) if self.duracao_audio_s is not None else None,
+            'tempo_total_s': round(tempo_total, 3),
+            'audio_s_por_s': (round(self.duracao_audio_s / tempo_total, 3)
+                              if self.duracao_audio_s is not None and tempo_total > 0 else None),
+            'carregamento_modelo_s': (round(self.carregamento_modelo_s, 3)
+                                      if self.carregamento_modelo_s is not None else None),
+            'etapas_s': {etapa: round(segundos, 4) for etapa, segundos in sorted(self.etapas.items())},
+            'chamadas': dict(sorted(self.chamadas.items())),
+            'segmentos': len(self.segmentos),
+            'latencia_segmento_s': estatisticas_latencia(registro['latencia_s'] for registro in self.segmentos),
+            'pico_rss_mb': obter_pico_rss_mb(),
+            'pico_rss_filhos_mb': obter_pico_rss_mb(filhos=True),
+            **self.extras,
+        }
+
+    def salvar(self, caminho, sucesso):
+        """Grava o relatório em JSON lines e retorna o registro de resumo."""
+        resumo = self.resumo(sucesso)
+        linhas = [json.dumps(registro, ensure_ascii=False) for registro in self.segmentos + [resumo]]
+        _escrever_atomicamente(caminho, "\n".join(linhas) + "\n")
+        return resumo
+
+def medir_etapa(relatorio, etapa):
+    """Mede `etapa` em `relatorio`; sem relatório, não faz nada."""
+    return relatorio.medir(etapa) if relatorio is not None else contextlib.nullcontext()
+
+def obter_caminho_relatorio(pasta_saida, nome_base):
+    """Caminho do relatório de execução (--relatorio)."""
+    return os.path.join(pasta_saida, f"{nome_base}_relatorio.jsonl")
+
+@contextlib.contextmanager
+def perfilar(caminho, perfilador='cprofile'):
+    """Captura um perfil do bloco em `caminho`: estatísticas do cProfile (.prof) ou HTML do pyinstrument."""
+    if perfilador == 'pyinstrument':
+        from pyinstrument import Profiler
+        perfil = Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            Path(caminho).write_text(perfil.output_html(), encoding='utf-8')
+            print(f"🔬 Perfil (pyinstrument) salvo em: {caminho}")
+    else:
+        import cProfile
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(caminho)
+            print(f"🔬 Perfil (cProfile) salvo em: {caminho} (veja com: python -m pstats {caminho})")
+
 def carregar_modelo_whisper(modelo="base"):
     """Carrega o modelo Whisper para transcrição."""
+    import whisper
     print(f"🤖 Carregando modelo Whisper '{modelo}'...")
     try:
         modelo_whisper = whisper.load_model(modelo)
@@ -55,31 +1101,311 @@ def carregar_modelo_whisper(modelo="base"):
         print(f"❌ Erro ao carregar modelo Whisper: {e}")
         return None
 
-def transcrever_audio(arquivo_audio, modelo_whisper, pasta_saida, nome_base, parte_num=None):
-    """Transcreve um arquivo de áudio usando Whisper."""
+# Resultado usado para segmentos sem fala, que não passam pelo Whisper
+RESULTADO_PULADO = {'text': '', 'segments': [], 'pulado': True}
+
+# Modelo carregado uma única vez em cada processo trabalhador (ver --workers) e tamanho do lote de janelas
+_modelo_trabalhador = None
+_lote_trabalhador = None
+
+def _inicializar_trabalhador(nome_modelo, threads_por_trabalhador, lote_whisper=None):
+    """Inicializador do pool: limita as threads do torch e carrega o modelo do processo."""
+    global _modelo_trabalhador, _lote_trabalhador
+    import torch
+    import whisper
+    # O Ctrl+C é tratado pelo processo principal (no --ao-vivo, o primeiro só encerra a leitura)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    torch.set_num_threads(threads_por_trabalhador)
+    _modelo_trabalhador = whisper.load_model(nome_modelo)
+    _lote_trabalhador = lote_whisper
+
+def _transcrever_no_trabalhador(audio):
+    """Executado dentro do processo trabalhador."""
+    return transcrever_segmento(_modelo_trabalhador, audio, _lote_trabalhador)
+
+# PCM em disco mapeado pelo processo trabalhador: (caminho, np.memmap) do último arquivo usado
+_pcm_trabalhador = (None, None)
+
+def _abrir_pcm_no_trabalhador(caminho_pcm):
+    """Mapeia o PCM em disco uma vez por processo (e por arquivo) e retorna o array."""
+    global _pcm_trabalhador
+    if _pcm_trabalhador[0] != caminho_pcm:
+        import numpy as np
+        _pcm_trabalhador = (caminho_pcm, np.memmap(caminho_pcm, dtype=np.float32, mode='c'))
+    return _pcm_trabalhador[1]
+
+def _transcrever_trecho_no_trabalhador(caminho_pcm, inicio, fim):
+    """Executado dentro do processo trabalhador: transcreve um trecho lido direto do PCM em disco."""
+    return transcrever_segmento(_modelo_trabalhador, _abrir_pcm_no_trabalhador(caminho_pcm)[inicio:fim],
+                                _lote_trabalhador)
+
+def criar_pool_transcricao(nome_modelo, workers, lote_whisper=None):
+    """Pool de `workers` processos, cada um com seu modelo `nome_modelo` e uma fatia dos núcleos para o torch."""
+    threads_por_trabalhador = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_inicializar_trabalhador,
+                               initargs=(nome_modelo, threads_por_trabalhador, lote_whisper))
+
+def transcrever_em_ordem(segmentos, modelo_whisper=None, nome_modelo="base", workers=1, cache=None, pular=None,
+                         pool=None, relatorio=None, trecho_pcm=None, lote_whisper=None, juntar_segmentos=True):
+    """
+    Transcreve tuplas (numero, segmento, duração) e gera (numero, segmento, duração, resultado) na ordem original.
+
+    Segmentos no `cache` ou com `pular(segmento)` verdadeiro não passam pelo
+    Whisper. Com `workers` > 1, até 2 segmentos por processo ficam em voo no
+    `pool` (criado aqui se não for passado); `trecho_pcm(numero)` → (caminho,
+    início, fim) faz os processos lerem o segmento do PCM em disco. Em um
+    único processo com `lote_whisper`, segmentos consecutivos são juntados
+    até somarem `lote_whisper` janelas de 30 s (cada um sozinho, sem
+    `juntar_segmentos`).
+    """
+    opcoes = OPCOES_WHISPER_LOTE if lote_whisper else OPCOES_WHISPER
+    pool_proprio = workers > 1 and pool is None
+    if pool_proprio:
+        pool = criar_pool_transcricao(nome_modelo, workers, lote_whisper)
+    usar_pool = workers > 1
+    # [numero, segmento, duração, chave do cache, futuro], na ordem de chegada
+    em_voo = deque()
+    # Entradas de em_voo ainda à espera do motor em lote (um único processo)
+    lote = []
+    janelas_lote = 0
+
+    def transcrever_lote():
+        nonlocal janelas_lote
+        with medir_etapa(relatorio, 'transcricao'):
+            resultados = transcrever_em_lote(modelo_whisper, [entrada[1] for entrada in lote], lote_whisper)
+        for entrada, resultado in zip(lote, resultados):
+            entrada[4].set_result(resultado)
+        lote.clear()
+        janelas_lote = 0
+
+    def entregar():
+        numero_pronto, segmento_pronto, duracao_pronta, chave, futuro = em_voo.popleft()
+        if not futuro.done():
+            if lote:
+                transcrever_lote()
+            else:
+                # Espera pelo processo do pool
+                with medir_etapa(relatorio, 'transcricao'):
+                    futuro.result()
+        resultado = futuro.result()
+        if chave is not None:
+            cache.guardar(chave, resultado)
+        return numero_pronto, segmento_pronto, duracao_pronta, resultado
+
     try:
-        print(f"🎤 Transcrevendo: {arquivo_audio}")
-
-        # Converte para WAV se necessário para melhor compatibilidade com Whisper
-        arquivo_temp = arquivo_audio
-        if arquivo_audio.lower().endswith('.m4a'):
-            arquivo_temp = arquivo_audio.replace('.m4a', '_temp.wav')
-            print(f"🔄 Convertendo M4A para WAV: {arquivo_temp}")
-
-            # Carrega com librosa e salva como WAV
-            audio_data, sample_rate = librosa.load(arquivo_audio, sr=None)
-            # Ajusta a normalização para valores similares ao arquivo WAV original
-            if audio_data.max() > 0.7:  # Se está muito normalizado
-                audio_data = audio_data * 0.6  # Reduz para valores similares ao WAV
-            sf.write(arquivo_temp, audio_data, sample_rate)
-
-        # Transcreve o áudio
-        resultado = modelo_whisper.transcribe(arquivo_temp, language="pt")
-        texto_transcrito = resultado["text"].strip()
+        for numero, segmento, duracao in segmentos:
+            chave = None
+            resultado = None
+            if pular is not None and pular(segmento):
+                resultado = RESULTADO_PULADO
+            elif cache is not None:
+                chave = cache.gerar_chave(segmento, nome_modelo, opcoes)
+                resultado = cache.obter(chave)
+                if resultado is not None:
+                    chave = None
+
+            entrada = [numero, segmento, duracao, chave, Future()]
+            if resultado is not None:
+                # Acerto no cache (ou segmento pulado): entra na fila já resolvido, preservando a ordem
+                entrada[4].set_result(resultado)
+            elif usar_pool and trecho_pcm is not None:
+                entrada[4] = pool.submit(_transcrever_trecho_no_trabalhador, *trecho_pcm(numero))
+            elif usar_pool:
+                entrada[4] = pool.submit(_transcrever_no_trabalhador, segmento)
+            elif lote_whisper:
+                lote.append(entrada)
+                janelas_lote += contar_janelas_whisper(segmento)
+            else:
+                with medir_etapa(relatorio, 'transcricao'):
+                    entrada[4].set_result(transcrever_segmento(modelo_whisper, segmento))
+            em_voo.append(entrada)
+
+            if lote and (janelas_lote >= lote_whisper or not juntar_segmentos):
+                transcrever_lote()
+            # Entrega o que já está pronto no início da fila; com o pool, no máximo 2 segmentos por processo em voo
+            while em_voo and (em_voo[0][4].done() or (usar_pool and len(em_voo) >= 2 * workers)):
+                yield entregar()
+
+        while em_voo:
+            yield entregar()
+    finally:
+        if pool_proprio:
+            pool.shutdown(cancel_futures=True)
+
+def carregar_trecho_calibracao(arquivo_entrada, duracao_total_s):
+    """Decodifica em 16 kHz o trecho do meio do arquivo usado pela calibração do --auto (onde é mais provável haver fala)."""
+    import librosa
+    duracao = min(max(TRECHOS_CALIBRACAO_S), duracao_total_s)
+    audio, _ = librosa.load(arquivo_entrada, sr=TAXA_WHISPER, offset=max(0.0, (duracao_total_s - duracao) / 2),
+                            duration=duracao)
+    return preparar_audio_whisper(audio, TAXA_WHISPER)
+
+def medir_velocidade_transcricao(audio, transcrever):
+    """
+    Mede a velocidade de `transcrever(audio)` com um trecho curto e um longo de `audio` (16 kHz).
+
+    Retorna (custo fixo por chamada em segundos, segundos de processamento
+    por segundo de áudio). Uma chamada de aquecimento, não medida, absorve
+    a inicialização do modelo.
+    """
+    transcrever(audio[:TAXA_WHISPER])
+    medicoes = []
+    for duracao in TRECHOS_CALIBRACAO_S:
+        trecho = audio[:int(duracao * TAXA_WHISPER)]
+        inicio = time.perf_counter()
+        transcrever(trecho)
+        medicoes.append((len(trecho) / TAXA_WHISPER, time.perf_counter() - inicio))
+    (curto_s, tempo_curto), (longo_s, tempo_longo) = medicoes
+    if longo_s - curto_s < 1:
+        # Arquivo curto demais para separar as duas parcelas: tudo vira custo por segundo
+        return 0.0, tempo_longo / longo_s
+    por_segundo = max((tempo_longo - tempo_curto) / (longo_s - curto_s), 1e-4)
+    return max(0.0, tempo_curto - por_segundo * curto_s), por_segundo
+
+def prever_tempo_transcricao(duracao_total_s, duracao_segmento_s, custo_fixo_s, por_segundo, workers=1,
+                             sobreposicao_s=0):
+    """
+    Tempo de relógio previsto para transcrever `duracao_total_s` em segmentos de `duracao_segmento_s`.
+
+    Cada segmento custa `custo_fixo_s` + `por_segundo` × (duração + sobreposição)
+    e vai para o primeiro dos `workers` processos que ficar livre.
+    """
+    num_segmentos = contar_segmentos(duracao_total_s, duracao_segmento_s, FRACAO_CAUDA_MINIMA)
+    duracoes = [duracao_segmento_s] * (num_segmentos - 1)
+    duracoes.append(duracao_total_s - duracao_segmento_s * (num_segmentos - 1))
+    livres = [0.0] * max(1, workers)
+    for duracao in duracoes:
+        i = livres.index(min(livres))
+        livres[i] += custo_fixo_s + por_segundo * (duracao + sobreposicao_s)
+    return max(livres)
+
+def escolher_duracao_segmento(duracao_total_s, custo_fixo_s, por_segundo, workers=1, sobreposicao_s=0):
+    """
+    Duração de segmento (em segundos) do --auto com o menor tempo previsto.
+
+    Segmentos curtos distribuem melhor o trabalho entre os processos, mas
+    pagam o custo fixo mais vezes. Entre previsões até 2% piores que a
+    melhor, fica a maior duração (menos chamadas e menos emendas).
+    """
+    candidatos = [duracao for duracao in range(PASSO_SEGMENTO_AUTO_S, SEGMENTO_MAXIMO_AUTO_S + 1, PASSO_SEGMENTO_AUTO_S)
+                  if duracao > sobreposicao_s]
+    previsoes = {duracao: prever_tempo_transcricao(duracao_total_s, duracao, custo_fixo_s, por_segundo, workers,
+                                                   sobreposicao_s)
+                 for duracao in candidatos}
+    melhor = min(previsoes.values())
+    return max(duracao for duracao, previsto in previsoes.items() if previsto <= melhor * 1.02)
+
+def calibrar_automaticamente(arquivo_entrada, nome_modelo, workers=1, prazo_s=None, rtf_alvo=None, sobreposicao_s=0,
+                             lote_whisper=None):
+    """
+    Modo --auto: mede a velocidade de transcrição em um trecho do arquivo e escolhe o modelo.
+
+    Sem `prazo_s` nem `rtf_alvo`, apenas `nome_modelo` é calibrado. Com um
+    deles, os modelos são medidos do menor para o maior, e fica o maior cuja
+    previsão para o arquivo inteiro (na melhor duração de segmento) cumpre a
+    meta: `prazo_s` segundos, ou `rtf_alvo` segundos por segundo de áudio. O
+    tempo já gasto na calibração conta para a meta.
+    Com `workers` > 1 a medição é feita em um processo do pool, com a mesma
+    fatia de CPU da transcrição, e com `lote_whisper`, com o motor em lote. Retorna (calibração, modelo carregado ou
+    None, pool ou None), ou None se nenhum modelo puder ser carregado; a
+    calibração é um dict com modelo, custo_fixo_s, por_segundo e workers.
+    """
+    inicio = time.perf_counter()
+    _, duracao_total_s = obter_info_audio(arquivo_entrada)
+    print(f"⏱️ Calibrando a velocidade de transcrição em {min(max(TRECHOS_CALIBRACAO_S), duracao_total_s):.0f}s "
+          f"de {Path(arquivo_entrada).name}...")
+    audio = carregar_trecho_calibracao(arquivo_entrada, duracao_total_s)
+
+    limite_s = prazo_s if prazo_s is not None else (rtf_alvo * duracao_total_s if rtf_alvo is not None else None)
+    candidatos = MODELOS_WHISPER if limite_s is not None else [nome_modelo]
+    escolhido = None
+    for candidato in candidatos:
+        modelo_whisper = pool = None
+        if workers > 1:
+            pool = criar_pool_transcricao(candidato, workers, lote_whisper)
+            transcrever = lambda audio, pool=pool: pool.submit(_transcrever_no_trabalhador, audio).result()
+        else:
+            modelo_whisper = carregar_modelo_whisper(candidato)
+            if modelo_whisper is None:
+                break
+            transcrever = lambda audio, modelo=modelo_whisper: transcrever_segmento(modelo, audio, lote_whisper)
+        custo_fixo_s, por_segundo = medir_velocidade_transcricao(audio, transcrever)
+        duracao_segmento_s = escolher_duracao_segmento(duracao_total_s, custo_fixo_s, por_segundo, workers,
+                                                       sobreposicao_s)
+        previsto_s = prever_tempo_transcricao(duracao_total_s, duracao_segmento_s, custo_fixo_s, por_segundo,
+                                              workers, sobreposicao_s)
+        # A calibração já consumiu parte do prazo (inclusive a dos modelos menores)
+        calibracao_s = time.perf_counter() - inicio
+        cumpre = limite_s is None or calibracao_s + previsto_s <= limite_s
+        print(f"   {'✓' if cumpre else '✗'} '{candidato}': {custo_fixo_s:.2f}s por chamada + {por_segundo:.3f}s por "
+              f"segundo de áudio → previsão de {previsto_s:.0f}s para {duracao_total_s:.0f}s de áudio "
+              f"(+{calibracao_s:.0f}s de calibração)")
+
+        if not cumpre and escolhido is not None:
+            # Modelos maiores são ainda mais lentos: fica o anterior
+            if pool is not None:
+                pool.shutdown()
+            break
+        if escolhido is not None and escolhido[2] is not None:
+            escolhido[2].shutdown()
+        calibracao = {'modelo': candidato, 'custo_fixo_s': round(custo_fixo_s, 4),
+                      'por_segundo': round(por_segundo, 5), 'workers': workers}
+        escolhido = (calibracao, modelo_whisper, pool)
+        if not cumpre:
+            print(f"⚠️  Nenhum modelo cumpre a meta de {limite_s:.0f}s; usando o menor ('{candidato}')")
+            break
+
+    if escolhido is not None and limite_s is not None:
+        print(f"✓ --auto: modelo '{escolhido[0]['modelo']}' (meta: {limite_s:.0f}s)")
+    return escolhido
+
+def duracao_segmento_automatica(arquivo_entrada, calibracao, pasta_saida, nome_base, recomecar=False,
+                                sobreposicao_s=0):
+    """
+    Duração de segmento (em minutos) escolhida pelo --auto para o arquivo.
+
+    Um job anterior do mesmo modelo na pasta de saída mantém a sua duração,
+    para que o manifesto continue compatível e o job possa ser retomado.
+    """
+    manifesto = None if recomecar else carregar_manifesto(pasta_saida, nome_base)
+    if manifesto is not None and manifesto.get('modelo') == calibracao['modelo']:
+        print(f"♻️ --auto: mantendo os segmentos de {manifesto['duracao_segmento_min']:g} min do job anterior")
+        return manifesto['duracao_segmento_min']
+    _, duracao_total_s = obter_info_audio(arquivo_entrada)
+    duracao_segmento_s = escolher_duracao_segmento(duracao_total_s, calibracao['custo_fixo_s'],
+                                                   calibracao['por_segundo'], calibracao['workers'], sobreposicao_s)
+    print(f"✓ --auto: segmentos de {duracao_segmento_s / 60:g} min "
+          f"({contar_segmentos(duracao_total_s, duracao_segmento_s, FRACAO_CAUDA_MINIMA)} segmentos, "
+          f"{calibracao['workers']} processo(s))")
+    return duracao_segmento_s / 60
+
+def transcrever_audio(audio, modelo_whisper, pasta_saida, nome_base, parte_num=None, nome_modelo=None, cache=None,
+                      relatorio=None):
+    """
+    Transcreve áudio usando Whisper.
 
-        # Remove arquivo temporário se foi criado
-        if arquivo_temp != arquivo_audio and os.path.exists(arquivo_temp):
-            os.remove(arquivo_temp)
+    `audio` pode ser o caminho de um arquivo (decodificado uma vez direto em
+    16 kHz) ou um array numpy 16 kHz mono já em memória. Com `cache`, o
+    resultado de um áudio idêntico já transcrito com `nome_modelo` é reaproveitado.
+    """
+    try:
+        if isinstance(audio, (str, os.PathLike)):
+            print(f"🎤 Transcrevendo: {audio}")
+            with medir_etapa(relatorio, 'carregamento'):
+                audio = carregar_audio_whisper(str(audio))
+            if relatorio is not None:
+                relatorio.duracao_audio_s = len(audio) / TAXA_WHISPER
+        elif parte_num is not None:
+            print(f"🎤 Transcrevendo parte {parte_num:02d}")
+        else:
+            print("🎤 Transcrevendo áudio")
+
+        # Transcreve o áudio em memória, sem arquivo temporário
+        with medir_etapa(relatorio, 'transcricao'):
+            resultado = transcrever_com_cache(modelo_whisper, audio, nome_modelo, cache)
+        texto_transcrito = resultado["text"].strip()
 
         # Nome do arquivo de transcrição
         if parte_num is not None:
@@ -90,7 +1416,7 @@ def transcrever_audio(arquivo_audio, modelo_whisper, pasta_saida, nome_base, par
         caminho_transcricao = os.path.join(pasta_saida, nome_transcricao)
 
         # Salva a transcrição
-        with open(caminho_transcricao, 'w', encoding='utf-8') as f:
+        with medir_etapa(relatorio, 'escrita'), open(caminho_transcricao, 'w', encoding='utf-8') as f:
             f.write(texto_transcrito)
 
         print(f"✓ Transcrição salva: {nome_transcricao}")
@@ -98,157 +1424,577 @@ def transcrever_audio(arquivo_audio, modelo_whisper, pasta_saida, nome_base, par
 
         return True
 
-    except Exception as e:
-        print(f"❌ Erro na transcrição: {e}")
-        return False
+    except Exception as e:
+        print(f"❌ Erro na transcrição: {e}")
+        return False
+
+def formatar_tempo(segundos, decimos=False):
+    """Segundos como HH:MM:SS (ou HH:MM:SS.d)."""
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    if decimos:
+        return f"{int(horas):02d}:{int(minutos):02d}:{segundos:04.1f}"
+    return f"{int(horas):02d}:{int(minutos):02d}:{int(segundos):02d}"
+
+def _normalizar_palavra(palavra):
+    return ''.join(caractere for caractere in palavra.lower() if caractere.isalnum())
+
+def _palavras_na_margem(trecho, limite_s):
+    """Quantas palavras iniciais do trecho caem antes de `limite_s`, supondo fala uniforme no trecho."""
+    palavras = len(trecho['texto'].split())
+    duracao = trecho['fim'] - trecho['inicio']
+    if duracao <= 0:
+        return palavras if trecho['inicio'] < limite_s else 0
+    return max(0, min(palavras, int(round((limite_s - trecho['inicio']) / duracao * palavras))))
+
+def remover_repeticao_inicial(texto_anterior, texto, max_palavras=20, max_remover=None):
+    """
+    Remove do início de `texto` as palavras que repetem o final de `texto_anterior`.
+
+    Só sequências de duas ou mais palavras contam (ignorando caixa e
+    pontuação), para não cortar palavras comuns repetidas por acaso. Com
+    `max_remover`, no máximo essa quantidade de palavras é removida.
+    """
+    if max_remover is not None:
+        max_palavras = min(max_palavras, max_remover)
+    finais = [_normalizar_palavra(p) for p in texto_anterior.split()[-max_palavras:]] if max_palavras > 0 else []
+    palavras = texto.split()
+    iniciais = [_normalizar_palavra(p) for p in palavras[:max_palavras]]
+    for tamanho in range(min(len(finais), len(iniciais)), 1, -1):
+        if finais[-tamanho:] == iniciais[:tamanho]:
+            return " ".join(palavras[tamanho:])
+    return texto
+
+def costurar_janela(resultado, inicio_janela_s, inicio_s, fim_s, tem_continuacao, texto_anterior=""):
+    """
+    Converte os trechos do Whisper de uma janela para o tempo do arquivo e remove a sobreposição.
+
+    A janela cobre o segmento [inicio_s, fim_s) mais uma margem dos vizinhos
+    (--sobreposicao). Cada trecho fica com a janela onde cai o seu ponto
+    médio, então o texto das margens, que a janela vizinha também
+    transcreveu, é descartado; sem `tem_continuacao` (última janela) não há
+    limite final. Palavras repetidas que ainda sobrem na emenda com
+    `texto_anterior` também são removidas, mas só as que caem na margem que a
+    janela anterior também cobriu. Retorna (texto, trechos), com os trechos
+    em [{'inicio', 'fim', 'texto'}] e tempos absolutos em segundos.
+    """
+    trechos = []
+    for trecho in resultado.get('segments', []):
+        inicio = inicio_janela_s + trecho['start']
+        fim = inicio_janela_s + trecho['end']
+        meio = (inicio + fim) / 2
+        if meio < inicio_s or (tem_continuacao and meio >= fim_s):
+            continue
+        trechos.append({'inicio': round(inicio, 2), 'fim': round(fim, 2), 'texto': trecho['text'].strip()})
+
+    # Sem margens, o texto é exatamente o do Whisper
+    if inicio_janela_s >= inicio_s and not tem_continuacao:
+        return resultado['text'].strip(), trechos
+
+    if trechos and texto_anterior:
+        primeiro = trechos[0]
+        primeiro['texto'] = remover_repeticao_inicial(
+            texto_anterior, primeiro['texto'],
+            max_remover=_palavras_na_margem(primeiro, inicio_s + (inicio_s - inicio_janela_s)))
+    trechos = [trecho for trecho in trechos if trecho['texto']]
+    return " ".join(trecho['texto'] for trecho in trechos), trechos
+
+def rotulo_segmento(registro):
+    """Rótulo de um segmento na transcrição: número e, se conhecido, o tempo de início no arquivo."""
+    if registro.get('inicio_s') is None:
+        return f"[{registro['numero']:02d}]"
+    return f"[{registro['numero']:02d} | {formatar_tempo(registro['inicio_s'])}]"
+
+def obter_caminho_diario(pasta_saida, nome_base):
+    """Caminho do diário append-only da transcrição completa."""
+    return os.path.join(pasta_saida, f"{nome_base}_transcricao.jsonl")
+
+def registrar_no_diario(diario, registro):
+    """Anexa um registro JSON ao diário e força a gravação em disco (fsync)."""
+    diario.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    diario.flush()
+    os.fsync(diario.fileno())
+
+def ler_diario(caminho_diario):
+    """
+    Lê os registros do diário.
+
+    Uma última linha truncada (queda do processo no meio da escrita) é ignorada.
+    """
+    registros = []
+    with open(caminho_diario, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                break
+    return registros
+
+def caminho_temporario(caminho):
+    """Nome único de temporário ao lado de `caminho` (mesma pasta, para o os.replace ser atômico)."""
+    return f"{caminho}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+
+def limpar_temporarios_abandonados(pasta, idade_minima_s=IDADE_TEMPORARIO_ABANDONADO_S):
+    """Remove de `pasta` os .tmp deixados por execuções interrompidas (os recentes podem ser de outra execução)."""
+    limite = time.time() - idade_minima_s
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+        with contextlib.suppress(OSError):
+            if nome.endswith('.tmp') and os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+
+def _escrever_atomicamente(caminho, conteudo):
+    """Escreve em um arquivo temporário e substitui o destino, para nunca deixar arquivo truncado."""
+    caminho_temp = caminho_temporario(caminho)
+    try:
+        with open(caminho_temp, 'x', encoding='utf-8') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(caminho_temp, caminho)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(caminho_temp)
+        raise
+
+def gerar_transcricoes_do_diario(pasta_saida, nome_base):
+    """
+    Gera os arquivos `_transcricao_completa.txt` e `_transcricao_detalhada.txt`
+    a partir do diário. Pode ser chamada ao final do processamento ou a
+    qualquer momento (inclusive com o job em andamento ou interrompido).
+    """
+    registros = ler_diario(obter_caminho_diario(pasta_saida, nome_base))
+    inicio = next((r for r in registros if r.get('tipo') == 'inicio'), {})
+    fim = next((r for r in registros if r.get('tipo') == 'fim'), None)
+    segmentos_info = [r for r in registros if r.get('tipo') == 'segmento']
+    com_texto = sorted((r for r in segmentos_info if r['texto']), key=lambda r: r['numero'])
+
+    if fim is not None:
+        total_segmentos = fim['total_segmentos']
+    else:
+        total_segmentos = inicio.get('total_segmentos') or len(segmentos_info)
+    duracao_total = sum(r['duracao'] for r in com_texto)
+    if fim is not None:
+        titulo = "🎵 TRANSCRIÇÃO COMPLETA DO ÁUDIO"
+        status = f"✅ COMPLETO - {len(com_texto)}/{total_segmentos} segmentos transcritos"
+    else:
+        titulo = "🎵 TRANSCRIÇÃO COMPLETA DO ÁUDIO (PARCIAL)"
+        status = f"{len(segmentos_info)}/{total_segmentos} segmentos processados"
+
+    linhas = [
+        titulo,
+        "=" * 50 + "\n",
+        f"Arquivo original: {inicio.get('arquivo', nome_base)}",
+        f"Total de segmentos: {total_segmentos}",
+        f"Duração total: {duracao_total:.1f} segundos",
+        f"Modelo usado: {inicio.get('modelo', 'whisper')}",
+        f"Status: {status}\n",
+        "=" * 50 + "\n",
+        "\n\n".join(f"{rotulo_segmento(r)} {r['texto']}" for r in com_texto),
+    ]
+    _escrever_atomicamente(os.path.join(pasta_saida, f"{nome_base}_transcricao_completa.txt"),
+                           "\n".join(linhas))
+
+    detalhado = ["🎵 TRANSCRIÇÃO DETALHADA DO ÁUDIO", "=" * 60 + "\n"]
+    for info in com_texto:
+        detalhado.append(f"SEGMENTO {info['numero']:02d}")
+        detalhado.append("-" * 30)
+        if info.get('inicio_s') is not None:
+            detalhado.append(f"Início: {formatar_tempo(info['inicio_s'])}")
+        detalhado.append(f"Duração: {info['duracao']:.1f} segundos")
+        detalhado.append(f"Texto: {info['texto']}\n")
+        if info.get('trechos'):
+            detalhado.append("Trechos:")
+            detalhado.extend(f"  [{formatar_tempo(t['inicio'], True)} → {formatar_tempo(t['fim'], True)}] {t['texto']}"
+                             for t in info['trechos'])
+            detalhado.append("")
+    _escrever_atomicamente(os.path.join(pasta_saida, f"{nome_base}_transcricao_detalhada.txt"),
+                           "\n".join(detalhado) + "\n")
+
+    return len(segmentos_info), total_segmentos
+
+def calcular_hash_arquivo(arquivo_entrada):
+    """SHA-256 do arquivo de entrada, lido em blocos de 1 MB."""
+    sha = hashlib.sha256()
+    with open(arquivo_entrada, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def obter_caminho_manifesto(pasta_saida, nome_base):
+    """Caminho do manifesto (checkpoint) do job de transcrição completa."""
+    return os.path.join(pasta_saida, f"{nome_base}_manifesto.json")
+
+def criar_manifesto(arquivo_entrada, hash_arquivo, nome_modelo, duracao_segmento_min, limites, sobreposicao_s=0,
+                    decodificacao=None):
+    """Cria um manifesto novo, com todos os segmentos pendentes."""
+    return {
+        'arquivo': str(arquivo_entrada),
+        'hash_arquivo': hash_arquivo,
+        'modelo': nome_modelo,
+        'duracao_segmento_min': duracao_segmento_min,
+        'sobreposicao_s': sobreposicao_s,
+        'decodificacao': decodificacao,
+        'segmentos': [{'numero': numero, 'inicio': inicio, 'fim': fim, 'status': 'pendente', 'texto': None}
+                      for numero, (inicio, fim) in enumerate(limites, 1)],
+    }
+
+def carregar_manifesto(pasta_saida, nome_base):
+    """Lê o manifesto do job; retorna None se não existir ou estiver ilegível."""
+    try:
+        with open(obter_caminho_manifesto(pasta_saida, nome_base), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def salvar_manifesto(pasta_saida, nome_base, manifesto):
+    """Grava o manifesto de forma atômica."""
+    _escrever_atomicamente(obter_caminho_manifesto(pasta_saida, nome_base),
+                           json.dumps(manifesto, ensure_ascii=False, indent=2))
+
+def manifesto_compativel(manifesto, hash_arquivo, nome_modelo, duracao_segmento_min, limites, sobreposicao_s=0,
+                         decodificacao=None):
+    """
+    Um job só pode ser retomado com o mesmo arquivo, modelo, limites de segmento,
+    sobreposição e opções de decodificação (motor em lote, limiar do VAD...).
+    """
+    limites_manifesto = [[entrada['inicio'], entrada['fim']] for entrada in manifesto.get('segmentos', [])
+                         if entrada['inicio'] is not None]
+    return (manifesto.get('hash_arquivo') == hash_arquivo
+            and manifesto.get('modelo') == nome_modelo
+            and manifesto.get('duracao_segmento_min') == duracao_segmento_min
+            and manifesto.get('sobreposicao_s', 0) == sobreposicao_s
+            and manifesto.get('decodificacao') == decodificacao
+            and limites_manifesto == [list(limite) for limite in limites])
+
+def atualizar_manifesto_com_diario(manifesto, registros):
+    """
+    Marca como concluídos no manifesto os segmentos registrados no diário.
+
+    Durante o job o status por segmento vive no diário append-only (custo
+    constante); o manifesto é consolidado a partir dele no início e no fim.
+    """
+    por_numero = {entrada['numero']: entrada for entrada in manifesto['segmentos']}
+    for registro in registros:
+        if registro.get('tipo') != 'segmento':
+            continue
+        entrada = por_numero.get(registro['numero'])
+        if entrada is None:
+            # No modo streaming o número de segmentos é estimado pelo cabeçalho
+            entrada = {'numero': registro['numero'], 'inicio': None, 'fim': None}
+            manifesto['segmentos'].append(entrada)
+            por_numero[registro['numero']] = entrada
+        entrada['status'] = 'concluido'
+        entrada['texto'] = registro['texto']
+        entrada['duracao'] = registro['duracao']
+        for chave in ('inicio_s', 'trechos'):
+            if chave in registro:
+                entrada[chave] = registro[chave]
+
+def segmentos_concluidos(manifesto):
+    """Retorna {numero: registro do diário} dos segmentos já transcritos."""
+    concluidos = {}
+    for entrada in manifesto['segmentos']:
+        if entrada['status'] != 'concluido':
+            continue
+        registro = {'tipo': 'segmento', 'numero': entrada['numero'],
+                    'duracao': entrada['duracao'], 'texto': entrada['texto']}
+        for chave in ('inicio_s', 'trechos'):
+            if chave in entrada:
+                registro[chave] = entrada[chave]
+        concluidos[entrada['numero']] = registro
+    return concluidos
+
+@dataclass
+class OpcoesTranscricao:
+    """Opções da transcrição completa e do --ao-vivo, montadas uma vez a partir da linha de comando."""
+    nome_modelo: str = None
+    workers: int = 1
+    pool: ProcessPoolExecutor = None
+    cache: 'CacheTranscricoes' = None
+    lote_whisper: int = None
+    sobreposicao_s: float = 0
+    vad: bool = False
+    tolerancia_corte_s: float = 10
+    limiar_fala: float = 0.1
+    streaming: bool = False
+    recomecar: bool = False
+    armazem_pcm: 'ArmazemPCM' = None
+    relatorio: 'RelatorioExecucao' = None
+    # Chamado com (processados, total) após cada segmento
+    ao_progredir: object = None
+
+    @classmethod
+    def dos_argumentos(cls, args, **extras):
+        """Opções a partir dos argumentos da linha de comando (ou de um job do --servir)."""
+        return cls(nome_modelo=args.modelo, workers=args.workers, lote_whisper=getattr(args, 'lote_whisper', None),
+                   sobreposicao_s=getattr(args, 'sobreposicao', 0), vad=args.vad,
+                   tolerancia_corte_s=args.tolerancia_corte, limiar_fala=args.limiar_fala,
+                   streaming=args.streaming, recomecar=args.recomecar, **extras)
+
+    def decodificacao(self):
+        """Opções que mudam o texto gerado (fazem parte da compatibilidade do manifesto)."""
+        return {'whisper': OPCOES_WHISPER_LOTE if self.lote_whisper else OPCOES_WHISPER,
+                'lote_whisper': self.lote_whisper,
+                'limiar_fala': self.limiar_fala if self.vad else None}
+
+    def nome_do_modelo(self, modelo_whisper):
+        if self.nome_modelo is not None:
+            return self.nome_modelo
+        return modelo_whisper.name if hasattr(modelo_whisper, 'name') else 'whisper'
+
+    def pular_sem_fala(self):
+        """Com `vad`, função que diz se um segmento de 16 kHz tem fala de menos para ser transcrito."""
+        if not self.vad:
+            return None
+
+        def pular(segmento):
+            with medir_etapa(self.relatorio, 'vad'):
+                return proporcao_fala(segmento, TAXA_WHISPER) < self.limiar_fala
+        return pular
+
+def transcrever_completa_com_progresso(arquivo_entrada, modelo_whisper, pasta_saida, nome_base, segmentos, opcoes,
+                                       total_segmentos=None, concluidos=None, trecho_pcm=None,
+                                       juntar_segmentos=True):
+    """
+    Transcreve todos os segmentos com barra de progresso, gravando o diário e o arquivo legível a cada segmento.
 
-def transcrever_completa_com_progresso(arquivo_entrada, modelo_whisper, pasta_saida, nome_base, segmentos):
-    """Transcreve todos os segmentos com barra de progresso e salva incrementalmente."""
-    print(f"\n🎤 Iniciando transcrição completa de {len(segmentos)} segmentos...")
+    `segmentos` gera (segmento em 16 kHz, duração) ou, com janelas sobrepostas,
+    (janela, duração, início, margem antes, margem depois), emendadas por
+    `costurar_janela`. `concluidos` ({numero: registro do diário}) são
+    segmentos de uma execução anterior, copiados sem nova inferência.
+    """
+    from tqdm import tqdm
+    concluidos = concluidos or {}
+    relatorio = opcoes.relatorio
+    if total_segmentos is None and hasattr(segmentos, '__len__'):
+        total_segmentos = len(segmentos)
+    total_exibido = total_segmentos if total_segmentos is not None else '?'
+    nome_modelo = opcoes.nome_do_modelo(modelo_whisper)
+    if opcoes.workers > 1:
+        print(f"⚙️ Transcrevendo com {opcoes.workers} processos em paralelo")
+    if opcoes.lote_whisper:
+        print(f"⚙️ Motor em lote: {opcoes.lote_whisper} janelas de 30s por passada do modelo")
+    print(f"\n🎤 Iniciando transcrição completa de {total_exibido} segmentos...")
     print("=" * 60)
 
-    # Cria os arquivos de transcrição no início
     nome_arquivo_completo = f"{nome_base}_transcricao_completa.txt"
     caminho_completo = os.path.join(pasta_saida, nome_arquivo_completo)
     nome_detalhado = f"{nome_base}_transcricao_detalhada.txt"
-    caminho_detalhado = os.path.join(pasta_saida, nome_detalhado)
 
-    # Inicializa os arquivos com cabeçalho
+    # Diário append-only: um registro JSON por segmento, gravado com fsync.
+    # Os arquivos finais são gerados a partir dele (ver gerar_transcricoes_do_diario).
+    diario = open(obter_caminho_diario(pasta_saida, nome_base), 'w', encoding='utf-8')
+    registrar_no_diario(diario, {'tipo': 'inicio', 'arquivo': str(arquivo_entrada),
+                                 'total_segmentos': total_segmentos, 'modelo': nome_modelo})
+
+    # Inicializa o arquivo legível com cabeçalho; cada segmento é apenas anexado ao final
     with open(caminho_completo, 'w', encoding='utf-8') as f:
         f.write("🎵 TRANSCRIÇÃO COMPLETA DO ÁUDIO (ATUALIZANDO...)\n")
         f.write("=" * 50 + "\n\n")
         f.write(f"Arquivo original: {arquivo_entrada}\n")
-        f.write(f"Total de segmentos: {len(segmentos)}\n")
-        f.write(f"Modelo usado: {modelo_whisper.name if hasattr(modelo_whisper, 'name') else 'whisper'}\n")
+        f.write(f"Total de segmentos: {total_exibido}\n")
+        f.write(f"Modelo usado: {nome_modelo}\n")
         f.write(f"Status: Processando segmentos...\n\n")
-        f.write("=" * 50 + "\n\n")
+        f.write("=" * 50 + "\n")
 
-    transcrições = []
-    segmentos_info = []
-
-    # Barra de progresso
-    with tqdm(total=len(segmentos), desc="🎵 Transcrevendo", unit="segmento") as pbar:
-        for i, (segmento, duracao) in enumerate(segmentos, 1):
-            # Salva o segmento como WAV
-            nome_arquivo = f"{nome_base}_parte_{i:02d}.wav"
-            caminho_wav = os.path.join(pasta_saida, nome_arquivo)
-            sf.write(caminho_wav, segmento, 48000)  # Usa sample rate padrão
-
-            # Transcreve
-            print(f"\n🔄 Processando segmento {i:02d}/{len(segmentos)}...")
-            resultado = modelo_whisper.transcribe(caminho_wav, language="pt")
-            texto_transcrito = resultado["text"].strip()
-
-            if texto_transcrito:
-                # Adiciona timestamp aproximado
-                timestamp = f"[{i:02d}] {texto_transcrito}"
-                transcrições.append(timestamp)
-                segmentos_info.append({
-                    'numero': i,
-                    'duracao': duracao,
-                    'texto': texto_transcrito,
-                    'timestamp': timestamp
-                })
-                print(f"✅ Segmento {i:02d}: {texto_transcrito[:100]}...")
-            else:
-                print(f"⚠️ Segmento {i:02d}: Sem transcrição detectada")
-
-            # Remove o arquivo WAV temporário
-            if os.path.exists(caminho_wav):
-                os.remove(caminho_wav)
-
-            # Atualiza arquivo de transcrição incrementalmente
-            transcricao_completa = "\n\n".join(transcrições)
-            with open(caminho_completo, 'w', encoding='utf-8') as f:
-                f.write("🎵 TRANSCRIÇÃO COMPLETA DO ÁUDIO (ATUALIZANDO...)\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(f"Arquivo original: {arquivo_entrada}\n")
-                f.write(f"Total de segmentos: {len(segmentos)}\n")
-                f.write(f"Segmentos processados: {len(transcrições)}\n")
-                f.write(f"Modelo usado: {modelo_whisper.name if hasattr(modelo_whisper, 'name') else 'whisper'}\n")
-                f.write(f"Status: {len(transcrições)}/{len(segmentos)} segmentos transcritos\n\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(transcricao_completa)
-
-            pbar.update(1)
-
-    # Atualização final com informações completas
-    duracao_total = sum(s['duracao'] for s in segmentos_info)
-    with open(caminho_completo, 'w', encoding='utf-8') as f:
-        f.write("🎵 TRANSCRIÇÃO COMPLETA DO ÁUDIO\n")
-        f.write("=" * 50 + "\n\n")
-        f.write(f"Arquivo original: {arquivo_entrada}\n")
-        f.write(f"Total de segmentos: {len(segmentos)}\n")
-        f.write(f"Duração total: {duracao_total:.1f} segundos\n")
-        f.write(f"Modelo usado: {modelo_whisper.name if hasattr(modelo_whisper, 'name') else 'whisper'}\n")
-        f.write(f"Status: ✅ COMPLETO - {len(transcrições)}/{len(segmentos)} segmentos transcritos\n\n")
-        f.write("=" * 50 + "\n\n")
-        f.write(transcricao_completa)
-
-    # Salva arquivo detalhado final
-    with open(caminho_detalhado, 'w', encoding='utf-8') as f:
-        f.write("🎵 TRANSCRIÇÃO DETALHADA DO ÁUDIO\n")
-        f.write("=" * 60 + "\n\n")
-        for info in segmentos_info:
-            f.write(f"SEGMENTO {info['numero']:02d}\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Duração: {info['duracao']:.1f} segundos\n")
-            f.write(f"Texto: {info['texto']}\n\n")
+    # Conta todos os segmentos produzidos, inclusive os retomados (o total real só é conhecido no fim)
+    produzidos = 0
+    # Posição de cada janela no arquivo: numero -> (início, margem antes, margem depois)
+    janelas = {}
+    # Texto já emendado de cada segmento, para remover repetições na emenda seguinte
+    textos = {numero: registro['texto'] for numero, registro in concluidos.items()}
+
+    def segmentos_pendentes():
+        nonlocal produzidos
+        for numero, (segmento, duracao, *janela) in enumerate(segmentos, 1):
+            produzidos = numero
+            if numero not in concluidos:
+                if janela:
+                    janelas[numero] = janela
+                yield numero, segmento, duracao
+
+    try:
+        with open(caminho_completo, 'a', encoding='utf-8') as arquivo_completo, \
+             tqdm(total=total_segmentos, initial=len(concluidos), desc="🎵 Transcrevendo", unit="segmento") as pbar:
+            # Segmentos de uma execução anterior são copiados sem nova inferência
+            for numero in sorted(concluidos):
+                registro = concluidos[numero]
+                registrar_no_diario(diario, registro)
+                if registro['texto']:
+                    arquivo_completo.write(f"\n{rotulo_segmento(registro)} {registro['texto']}\n")
+            arquivo_completo.flush()
+
+            # Os resultados chegam na ordem dos segmentos, mesmo com vários processos
+            resultados = transcrever_em_ordem(segmentos_pendentes(), modelo_whisper, nome_modelo, opcoes.workers,
+                                              opcoes.cache, opcoes.pular_sem_fala(), opcoes.pool, relatorio,
+                                              trecho_pcm, opcoes.lote_whisper, juntar_segmentos)
+            marca = time.perf_counter()
+            for i, segmento, duracao, resultado in resultados:
+                # Transcrição feita com o array em memória (sem WAV temporário)
+                print(f"\n🔄 Processando segmento {i:02d}/{total_exibido}...")
+                janela = janelas.pop(i, None)
+                if janela is not None:
+                    inicio_s, antes_s, depois_s = janela
+                    texto_transcrito, trechos = costurar_janela(resultado, inicio_s - antes_s, inicio_s,
+                                                                inicio_s + duracao, depois_s > 0,
+                                                                textos.get(i - 1, ""))
+                else:
+                    texto_transcrito = resultado["text"].strip()
+                textos[i] = texto_transcrito
+
+                # Custo constante por segmento: um registro no diário + uma linha anexada
+                registro = {'tipo': 'segmento', 'numero': i, 'duracao': duracao, 'texto': texto_transcrito}
+                if janela is not None:
+                    registro['inicio_s'] = round(inicio_s, 3)
+                    registro['trechos'] = trechos
+                if resultado.get('pulado'):
+                    registro['pulado'] = True
+                with medir_etapa(relatorio, 'escrita'):
+                    registrar_no_diario(diario, registro)
+
+                if resultado.get('pulado'):
+                    print(f"⏭️ Segmento {i:02d}: Sem fala detectada, pulado")
+                elif texto_transcrito:
+                    with medir_etapa(relatorio, 'escrita'):
+                        arquivo_completo.write(f"\n{rotulo_segmento(registro)} {texto_transcrito}\n")
+                        arquivo_completo.flush()
+                    print(f"✅ Segmento {i:02d}: {texto_transcrito[:100]}...")
+                else:
+                    print(f"⚠️ Segmento {i:02d}: Sem transcrição detectada")
+
+                if relatorio is not None:
+                    # Latência de relógio: da entrega do segmento anterior até a deste
+                    agora = time.perf_counter()
+                    extras = {'pulado': True} if resultado.get('pulado') else {}
+                    relatorio.registrar_segmento(i, duracao, agora - marca, **extras)
+                    marca = agora
+
+                pbar.update(1)
+                if opcoes.ao_progredir is not None:
+                    opcoes.ao_progredir(pbar.n, total_segmentos)
+
+        # Marca o fim do job com o número real de segmentos (no streaming o total é estimado)
+        registrar_no_diario(diario, {'tipo': 'fim', 'total_segmentos': produzidos})
+    finally:
+        diario.close()
+
+    # Gera as versões finais (completa e detalhada) a partir do diário
+    with medir_etapa(relatorio, 'escrita'):
+        gerar_transcricoes_do_diario(pasta_saida, nome_base)
 
     print(f"\n🎉 Transcrição completa finalizada!")
     print(f"📄 Arquivo principal: {nome_arquivo_completo}")
     print(f"📄 Arquivo detalhado: {nome_detalhado}")
-    print(f"📊 Total de segmentos processados: {len(segmentos)}")
+    print(f"📊 Total de segmentos processados: {produzidos}")
 
     return True
 
-def dividir_e_transcrever_completa(arquivo_entrada, duracao_segmento_min=4, modelo_whisper=None):
-    """Divide um arquivo de áudio e transcreve tudo em um único arquivo com barra de progresso."""
+def dividir_e_transcrever_completa(arquivo_entrada, duracao_segmento_min=4, modelo_whisper=None, opcoes=None):
+    """
+    Divide um arquivo de áudio e transcreve tudo em um único arquivo com barra de progresso.
+
+    Um manifesto compatível na pasta de saída (sem `opcoes.recomecar`) retoma o
+    job: só os segmentos ainda não transcritos passam pelo Whisper.
+    """
+    opcoes = opcoes or OpcoesTranscricao()
+    relatorio, streaming, armazem_pcm = opcoes.relatorio, opcoes.streaming, opcoes.armazem_pcm
+    sobreposicao_s = opcoes.sobreposicao_s
     try:
         print(f"🎵 Carregando arquivo: {arquivo_entrada}")
 
-        # Carrega o arquivo de áudio
-        audio_data, sample_rate = librosa.load(arquivo_entrada, sr=None)
+        # Decodifica uma única vez, já em 16 kHz mono para o Whisper
+        # (no modo streaming, apenas o cabeçalho é lido aqui). Carregamento,
+        # decodificação e reamostragem são medidos dentro de carregar_segmentos
+        sample_rate, duracao_total_segundos, limites, gerador = carregar_segmentos(
+            arquivo_entrada, duracao_segmento_min, streaming, sr_alvo=TAXA_WHISPER,
+            tolerancia_corte_s=opcoes.tolerancia_corte_s if opcoes.vad else None, armazem_pcm=armazem_pcm,
+            relatorio=relatorio, fracao_cauda_minima=FRACAO_CAUDA_MINIMA)
+        num_segmentos = len(limites)
+        if relatorio is not None:
+            relatorio.duracao_audio_s = duracao_total_segundos
 
         # Informações do arquivo
-        duracao_total_segundos = len(audio_data) / sample_rate
         duracao_total_minutos = duracao_total_segundos / 60
 
         print(f"📊 Taxa de amostragem: {sample_rate} Hz")
         print(f"📊 Duração total: {duracao_total_minutos:.2f} minutos")
         print(f"📊 Duração total: {duracao_total_segundos:.2f} segundos")
+        if armazem_pcm is not None:
+            print("📊 PCM em disco: segmentos lidos do arquivo mapeado em memória")
+        elif streaming:
+            print("📊 Modo streaming: segmentos decodificados sob demanda")
 
         # Cria a pasta de saída
         pasta_saida = criar_pasta_saida(arquivo_entrada)
         nome_base = Path(arquivo_entrada).stem
 
-        # Calcula a duração de cada segmento em amostras
-        duracao_segmento_amostras = int(duracao_segmento_min * 60 * sample_rate)
+        # Cada janela leva metade da sobreposição de cada vizinho
+        amostras_margem = int(round(sobreposicao_s / 2 * sample_rate))
+        if sobreposicao_s:
+            print(f"📁 Janelas sobrepostas em {sobreposicao_s:g}s (emenda pelos tempos do Whisper)")
 
-        # Coleta todos os segmentos
-        segmentos = []
-        num_segmentos = int(len(audio_data) / duracao_segmento_amostras) + 1
+        # Os processos trabalhadores leem o segmento do PCM em disco: só os deslocamentos são enviados
+        trecho_pcm = None
+        if armazem_pcm is not None and opcoes.workers > 1:
+            caminho_pcm = armazem_pcm.caminho(arquivo_entrada, TAXA_WHISPER)
+            fronteiras = [(round(inicio * sample_rate), round(fim * sample_rate)) for inicio, fim in limites]
+            total_amostras = fronteiras[-1][1]
+            trecho_pcm = lambda numero: (caminho_pcm,
+                                         max(0, fronteiras[numero - 1][0] - amostras_margem),
+                                         min(total_amostras, fronteiras[numero - 1][1] + amostras_margem))
 
         print(f"📁 Preparando {num_segmentos} segmentos de {duracao_segmento_min} minutos cada")
-        print(f"📁 Arquivos serão salvos em formato WAV para melhor transcrição")
-
-        for i in range(num_segmentos):
-            inicio_amostra = i * duracao_segmento_amostras
-            fim_amostra = min((i + 1) * duracao_segmento_amostras, len(audio_data))
+        print(f"📁 Segmentos enviados ao Whisper em memória ({TAXA_WHISPER} Hz mono)")
+        if opcoes.vad:
+            imprimir_info_vad(streaming, opcoes.tolerancia_corte_s, opcoes.limiar_fala)
 
-            # Extrai o segmento
-            segmento = audio_data[inicio_amostra:fim_amostra]
-            duracao_segmento = len(segmento) / sample_rate
+        # Os segmentos são decodificados em uma thread própria (fila limitada),
+        # sobrepondo a decodificação do próximo segmento com a inferência do atual
+        def janelas():
+            decorrido = 0
+            for janela, antes, amostras in pre_carregar(janelas_com_sobreposicao(gerador, amostras_margem)):
+                depois = len(janela) - antes - amostras
+                # O áudio já está em 16 kHz: aqui só se garante um array contíguo e gravável
+                yield (preparar_audio_whisper(janela, sample_rate), amostras / sample_rate, decorrido / sample_rate,
+                       antes / sample_rate, depois / sample_rate)
+                decorrido += amostras
 
-            segmentos.append((segmento, duracao_segmento))
+        segmentos = janelas()
 
         # Transcreve todos os segmentos com barra de progresso
-        if modelo_whisper is None:
+        if modelo_whisper is None and opcoes.workers <= 1:
             print("❌ Modelo Whisper necessário para transcrição completa")
             return False
+        nome_modelo = opcoes.nome_do_modelo(modelo_whisper)
+
+        # Manifesto do job: retoma uma execução anterior interrompida, se compatível
+        print("🔐 Calculando hash do arquivo de entrada...")
+        with medir_etapa(relatorio, 'hash'):
+            hash_arquivo = calcular_hash_arquivo(arquivo_entrada)
+        manifesto = carregar_manifesto(pasta_saida, nome_base)
+        concluidos = {}
+        if (manifesto is not None and not opcoes.recomecar
+                and manifesto_compativel(manifesto, hash_arquivo, nome_modelo, duracao_segmento_min, limites,
+                                         sobreposicao_s, opcoes.decodificacao())):
+            caminho_diario = obter_caminho_diario(pasta_saida, nome_base)
+            if os.path.exists(caminho_diario):
+                atualizar_manifesto_com_diario(manifesto, ler_diario(caminho_diario))
+            concluidos = segmentos_concluidos(manifesto)
+            print(f"♻️ Retomando job: {len(concluidos)}/{num_segmentos} segmentos já transcritos")
+        else:
+            manifesto = criar_manifesto(arquivo_entrada, hash_arquivo, nome_modelo, duracao_segmento_min, limites,
+                                        sobreposicao_s, opcoes.decodificacao())
+        salvar_manifesto(pasta_saida, nome_base, manifesto)
+
+        sucesso = transcrever_completa_com_progresso(arquivo_entrada, modelo_whisper, pasta_saida, nome_base,
+                                                   segmentos, replace(opcoes, nome_modelo=nome_modelo),
+                                                   total_segmentos=num_segmentos, concluidos=concluidos,
+                                                   trecho_pcm=trecho_pcm)
 
-        sucesso = transcrever_completa_com_progresso(arquivo_entrada, modelo_whisper,
-                                                   pasta_saida, nome_base, segmentos)
+        # Consolida no manifesto o status e o texto de cada segmento
+        atualizar_manifesto_com_diario(manifesto, ler_diario(obter_caminho_diario(pasta_saida, nome_base)))
+        salvar_manifesto(pasta_saida, nome_base, manifesto)
 
         if sucesso:
             print(f"\n🎉 Processo completo finalizado!")
@@ -259,7 +2005,10 @@ def dividir_e_transcrever_completa(arquivo_entrada, duracao_segmento_min=4, mode
         print(f"❌ Erro no processamento: {str(e)}")
         return False
 
-def dividir_audio(arquivo_entrada, duracao_segmento_min=4, transcrever=False, apenas_transcrever=False, modelo_whisper=None):
+def dividir_audio(arquivo_entrada, duracao_segmento_min=4, transcrever=False, apenas_transcrever=False, modelo_whisper=None,
+                  streaming=False, trabalhadores_export=2, nome_modelo=None, cache=None,
+                  vad=False, tolerancia_corte_s=10, limiar_fala=0.1, ao_progredir=None, relatorio=None,
+                  jobs=None, pool_exportacao=None, armazem_pcm=None):
     """
     Divide um arquivo de áudio em segmentos menores e opcionalmente transcreve.
     
@@ -269,92 +2018,142 @@ def dividir_audio(arquivo_entrada, duracao_segmento_min=4, transcrever=False, ap
         transcrever (bool): Se deve transcrever cada segmento
         apenas_transcrever (bool): Se deve apenas transcrever sem dividir
         modelo_whisper: Modelo Whisper carregado
+        streaming (bool): Se deve ler o arquivo em blocos do tamanho de um segmento
+        trabalhadores_export (int): Quantas exportações M4A podem rodar em paralelo
+        nome_modelo (str): Nome do modelo Whisper (usado na chave do cache)
+        cache (CacheTranscricoes): Cache de transcrições consultado antes do Whisper
+        vad (bool): Se deve cortar nas pausas e não transcrever segmentos sem fala
+        tolerancia_corte_s (float): Quanto cada corte pode se mover, em segundos (com vad)
+        limiar_fala (float): Fração mínima de quadros com fala para transcrever (com vad)
+        ao_progredir (callable): Chamado com (partes concluídas, total) após cada parte
+        relatorio (RelatorioExecucao): Instrumentação por etapa e por segmento (--relatorio)
+        jobs (int): Se informado, exporta em `jobs` processos (memória compartilhada) em vez de threads
+        pool_exportacao (ProcessPoolExecutor): Pool de `jobs` processos já criado (ver criar_pool_exportacao)
+        armazem_pcm (ArmazemPCM): Lê o áudio decodificado do PCM em disco, mapeado em memória
     """
     try:
-        print(f"🎵 Carregando arquivo: {arquivo_entrada}")
-        
-        # Carrega o arquivo de áudio
-        audio_data, sample_rate = librosa.load(arquivo_entrada, sr=None)
-        
-        # Informações do arquivo
-        duracao_total_segundos = len(audio_data) / sample_rate
-        duracao_total_minutos = duracao_total_segundos / 60
-        
-        print(f"📊 Taxa de amostragem: {sample_rate} Hz")
-        print(f"📊 Duração total: {duracao_total_minutos:.2f} minutos")
-        print(f"📊 Duração total: {duracao_total_segundos:.2f} segundos")
-        
-        # Cria a pasta de saída
-        pasta_saida = criar_pasta_saida(arquivo_entrada)
-        
-        # Se apenas transcrever, faz isso e retorna
+        # Se apenas transcrever, decodifica uma única vez direto em 16 kHz e retorna
         if apenas_transcrever:
             if modelo_whisper is None:
                 print("❌ Modelo Whisper necessário para transcrição")
                 return False
             
+            pasta_saida = criar_pasta_saida(arquivo_entrada)
             print("🎤 Transcrevendo arquivo completo...")
             nome_base = Path(arquivo_entrada).stem
-            sucesso = transcrever_audio(arquivo_entrada, modelo_whisper, pasta_saida, nome_base)
+            sucesso = transcrever_audio(arquivo_entrada, modelo_whisper, pasta_saida, nome_base,
+                                        nome_modelo=nome_modelo, cache=cache, relatorio=relatorio)
             
             if sucesso:
                 print(f"\n🎉 Transcrição concluída! Arquivo salvo em '{pasta_saida}'")
             return sucesso
         
-        # Calcula a duração de cada segmento em amostras
-        duracao_segmento_amostras = int(duracao_segmento_min * 60 * sample_rate)
+        print(f"🎵 Carregando arquivo: {arquivo_entrada}")
         
-        # Calcula quantos segmentos serão criados
-        num_segmentos = int(len(audio_data) / duracao_segmento_amostras) + 1
+        # Carrega o arquivo de áudio (ou apenas o cabeçalho, no modo streaming)
+        with medir_etapa(relatorio, 'carregamento'):
+            sample_rate, duracao_total_segundos, limites, gerador = carregar_segmentos(
+                arquivo_entrada, duracao_segmento_min, streaming,
+                tolerancia_corte_s=tolerancia_corte_s if vad else None, armazem_pcm=armazem_pcm,
+                # Só a transcrição junta a sobra curta; a divisão simples mantém os cortes fixos
+                fracao_cauda_minima=FRACAO_CAUDA_MINIMA if transcrever else 0)
+        num_segmentos = len(limites)
+        if relatorio is not None:
+            relatorio.duracao_audio_s = duracao_total_segundos
+        
+        # Informações do arquivo
+        duracao_total_minutos = duracao_total_segundos / 60
+        
+        print(f"📊 Taxa de amostragem: {sample_rate} Hz")
+        print(f"📊 Duração total: {duracao_total_minutos:.2f} minutos")
+        print(f"📊 Duração total: {duracao_total_segundos:.2f} segundos")
+        if armazem_pcm is not None:
+            print("📊 PCM em disco: segmentos lidos do arquivo mapeado em memória")
+        elif streaming:
+            print("📊 Modo streaming: segmentos decodificados sob demanda")
+        
+        # Cria a pasta de saída
+        pasta_saida = criar_pasta_saida(arquivo_entrada)
         
         print(f"📁 Criando {num_segmentos} segmentos de {duracao_segmento_min} minutos cada")
         print(f"📁 Salvando em: {pasta_saida}/")
+        if vad:
+            imprimir_info_vad(streaming, tolerancia_corte_s, limiar_fala)
         
-        # Divide o áudio em segmentos
-        for i in range(num_segmentos):
-            inicio_amostra = i * duracao_segmento_amostras
-            fim_amostra = min((i + 1) * duracao_segmento_amostras, len(audio_data))
-            
-            # Extrai o segmento
-            segmento = audio_data[inicio_amostra:fim_amostra]
-            
-            # Nome do arquivo de saída
-            nome_base = Path(arquivo_entrada).stem
-            extensao = Path(arquivo_entrada).suffix
-            
+        nome_base = Path(arquivo_entrada).stem
+        
+        # Com --jobs, cada exportação roda em um processo; as threads do pipeline só esperam
+        pool_proprio = jobs is not None and pool_exportacao is None
+        if pool_proprio:
+            pool_exportacao = criar_pool_exportacao(jobs)
+        if jobs is not None:
+            trabalhadores_export = jobs
+            print(f"⚙️ Exportando com {jobs} processos em paralelo")
+        # Com o PCM em disco, os processos recebem só os deslocamentos de cada parte
+        caminho_pcm = armazem_pcm.caminho(arquivo_entrada) if armazem_pcm is not None else None
+        fronteiras = [(round(inicio * sample_rate), round(fim * sample_rate)) for inicio, fim in limites]
+        
+        def exportar(i, segmento):
             # Sempre salvar como M4A para manter consistência
-            extensao_saida = '.m4a'
-            nome_arquivo = f"{nome_base}_parte_{i+1:02d}{extensao_saida}"
+            nome_arquivo = f"{nome_base}_parte_{i+1:02d}.m4a"
             caminho_saida = os.path.join(pasta_saida, nome_arquivo)
-            
-            # Converter numpy array para AudioSegment e salvar como M4A
-            # Primeiro, normalizar o áudio para o formato correto
-            if segmento.dtype != np.float32:
-                segmento = segmento.astype(np.float32)
-            
-            # Converter para AudioSegment
-            audio_segment = AudioSegment(
-                segmento.tobytes(),
-                frame_rate=sample_rate,
-                sample_width=4,  # 32-bit float
-                channels=1 if len(segmento.shape) == 1 else segmento.shape[1]
-            )
-            
-            # Salvar como M4A
-            audio_segment.export(caminho_saida, format="mp4")
-            
-            # Informações do segmento
+            with medir_etapa(relatorio, 'exportacao'):
+                if pool_exportacao is not None and caminho_pcm is not None:
+                    pool_exportacao.submit(_exportar_trecho_no_trabalhador, caminho_pcm, *fronteiras[i],
+                                           sample_rate, caminho_saida).result()
+                elif pool_exportacao is not None:
+                    exportar_em_processo(pool_exportacao, segmento, sample_rate, caminho_saida)
+                else:
+                    exportar_segmento_m4a(segmento, sample_rate, caminho_saida)
+            return nome_arquivo
+        
+        def transcrever_parte(i, segmento):
+            if vad:
+                with medir_etapa(relatorio, 'vad'):
+                    sem_fala = proporcao_fala(segmento, sample_rate) < limiar_fala
+                if sem_fala:
+                    print(f"⏭️ Parte {i+1:02d}: Sem fala detectada, transcrição pulada")
+                    return False
+            # Para transcrição, usa o segmento numpy diretamente, reamostrado para 16 kHz
+            with medir_etapa(relatorio, 'reamostragem'):
+                audio_whisper = preparar_audio_whisper(segmento, sample_rate)
+            return transcrever_audio(audio_whisper, modelo_whisper, pasta_saida, nome_base, i+1,
+                                     nome_modelo=nome_modelo, cache=cache, relatorio=relatorio)
+        
+        num_criados = 0
+        marca = time.perf_counter()
+        
+        def ao_concluir(i, segmento, nome_arquivo, _transcrito):
+            # Chamado na ordem dos segmentos, mesmo que as exportações terminem fora de ordem
+            nonlocal num_criados, marca
+            num_criados += 1
             duracao_segmento_atual = len(segmento) / sample_rate
             print(f"✓ Parte {i+1:02d}: {nome_arquivo} ({duracao_segmento_atual:.1f}s)")
-            
-            # Transcrever se solicitado
-            if transcrever and modelo_whisper is not None:
-                # Para transcrição, usa o segmento numpy diretamente (mais confiável)
-                caminho_wav = caminho_saida.replace('.m4a', '.wav')
-                sf.write(caminho_wav, segmento, sample_rate)
-                transcrever_audio(caminho_wav, modelo_whisper, pasta_saida, nome_base, i+1)
+            if relatorio is not None:
+                agora = time.perf_counter()
+                relatorio.registrar_segmento(i + 1, duracao_segmento_atual, agora - marca)
+                marca = agora
+            if ao_progredir is not None:
+                ao_progredir(num_criados, num_segmentos)
         
-        print(f"\n🎉 Divisão concluída! {num_segmentos} arquivos criados em '{pasta_saida}'")
+        # Decodificação, exportação e transcrição rodam em estágios sobrepostos
+        try:
+            tempos = executar_pipeline(
+                gerador,
+                exportar=exportar,
+                transcrever=transcrever_parte if transcrever and modelo_whisper is not None else None,
+                ao_concluir=ao_concluir,
+                trabalhadores_export=trabalhadores_export
+            )
+        finally:
+            if pool_proprio:
+                pool_exportacao.shutdown(cancel_futures=True)
+        
+        print(f"\n🎉 Divisão concluída! {num_criados} arquivos criados em '{pasta_saida}'")
+        imprimir_tempos_etapas(tempos)
+        if relatorio is not None:
+            # A decodificação roda na thread produtora do pipeline, medida por executar_pipeline
+            relatorio.somar('decodificacao', tempos['decodificacao'], chamadas=num_criados)
         
     except FileNotFoundError:
         print(f"❌ Erro: Arquivo não encontrado: {arquivo_entrada}")
@@ -365,64 +2164,963 @@ def dividir_audio(arquivo_entrada, duracao_segmento_min=4, transcrever=False, ap
     
     return True
 
-def main():
-    """Função principal do script."""
-    print("🎵 Divisor de Arquivos de Áudio com Transcrição")
+def dividir_audio_sem_recodificar(arquivo_entrada, duracao_segmento_min=4):
+    """
+    Divide o arquivo copiando os pacotes de áudio (ffmpeg stream copy), sem decodificar nem recodificar.
+
+    As partes mantêm o codec e a extensão do arquivo original, sem perda de
+    qualidade. Os cortes caem no limite de pacote mais próximo (dezenas de
+    milissegundos para AAC/MP3).
+    """
+    try:
+        print(f"🎵 Lendo cabeçalho: {arquivo_entrada}")
+        sample_rate, duracao_total_segundos = obter_info_audio(arquivo_entrada)
+        
+        print(f"📊 Taxa de amostragem: {sample_rate} Hz")
+        print(f"📊 Duração total: {duracao_total_segundos / 60:.2f} minutos")
+        print(f"📊 Duração total: {duracao_total_segundos:.2f} segundos")
+        
+        pasta_saida = criar_pasta_saida(arquivo_entrada)
+        nome_base = Path(arquivo_entrada).stem
+        extensao = Path(arquivo_entrada).suffix
+        
+        num_segmentos = contar_segmentos(duracao_total_segundos, duracao_segmento_min * 60)
+        limites = calcular_limites_segmentos(duracao_total_segundos, duracao_segmento_min, num_segmentos)
+        
+        print(f"📁 Criando {num_segmentos} segmentos de {duracao_segmento_min} minutos cada (cópia sem recodificar)")
+        print(f"📁 Salvando em: {pasta_saida}/")
+        
+        # Um único processo ffmpeg corta todas as partes com o muxer de segmentos
+        padrao_saida = os.path.join(pasta_saida, f"{nome_base}_parte_%02d{extensao}")
+        comando = ['ffmpeg', '-v', 'error', '-y', '-i', arquivo_entrada,
+                   '-map', '0:a', '-c', 'copy', '-f', 'segment',
+                   '-segment_start_number', '1', '-reset_timestamps', '1']
+        if len(limites) > 1:
+            comando += ['-segment_times', ','.join(f"{inicio:.3f}" for inicio, _ in limites[1:])]
+        else:
+            # Parte única (inclusive com a sobra final juntada): o tempo de segmento cobre o arquivo inteiro
+            comando += ['-segment_time', str(math.ceil(duracao_total_segundos) + 1)]
+        comando.append(padrao_saida)
+        subprocess.run(comando, check=True, capture_output=True, text=True)
+        
+        for i, (inicio, fim) in enumerate(limites, 1):
+            nome_arquivo = f"{nome_base}_parte_{i:02d}{extensao}"
+            if os.path.exists(os.path.join(pasta_saida, nome_arquivo)):
+                print(f"✓ Parte {i:02d}: {nome_arquivo} ({fim - inicio:.1f}s)")
+        
+        print(f"\n🎉 Divisão concluída! {num_segmentos} arquivos criados em '{pasta_saida}'")
+        
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Erro do ffmpeg ao dividir: {e.stderr.strip()}")
+        return False
+    except Exception as e:
+        print(f"❌ Erro ao processar o arquivo: {str(e)}")
+        return False
+    
+    return True
+
+def interpretar_entrada_bruta(texto):
+    """Converte o valor de --entrada-bruta, FORMATO:TAXA:CANAIS (ex.: s16le:16000:1), em uma tupla."""
+    try:
+        formato, taxa, canais = texto.split(':')
+        taxa, canais = int(taxa), int(canais)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"use FORMATO:TAXA:CANAIS (ex.: s16le:16000:1), não '{texto}'")
+    if formato not in FORMATOS_PCM_BRUTO or taxa <= 0 or canais <= 0:
+        raise argparse.ArgumentTypeError(f"formato deve ser {' ou '.join(FORMATOS_PCM_BRUTO)}, "
+                                         f"com taxa e canais positivos")
+    return formato, taxa, canais
+
+def _ler_pcm_ao_vivo(arquivo, formato, canais, espera_s=None, parar=None):
+    """
+    Gera blocos mono float32 com os bytes PCM de `arquivo` conforme eles chegam.
+
+    Sem `espera_s`, a leitura termina no fim do fluxo (pipe). Com `espera_s`,
+    o fim do arquivo só encerra a leitura depois de `espera_s` segundos sem
+    novos dados (arquivo ainda em gravação).
+    """
+    import numpy as np
+    tipo = np.dtype(FORMATOS_PCM_BRUTO[formato])
+    escala = 32768.0 if formato == 's16le' else 1.0
+    bytes_quadro = tipo.itemsize * canais
+    # read1 devolve o que já chegou, sem esperar completar o tamanho pedido
+    ler = getattr(arquivo, 'read1', arquivo.read)
+    resto = b''
+    ultimo_dado = time.monotonic()
+    while parar is None or not parar.is_set():
+        dados = ler(TAMANHO_LEITURA_AO_VIVO)
+        if not dados:
+            if espera_s is None or time.monotonic() - ultimo_dado > espera_s:
+                break
+            time.sleep(INTERVALO_ESPERA_AO_VIVO)
+            continue
+        ultimo_dado = time.monotonic()
+        # Um quadro pode chegar partido entre duas leituras
+        dados = resto + dados
+        completos = len(dados) - len(dados) % bytes_quadro
+        resto = dados[completos:]
+        if completos:
+            bloco = np.frombuffer(dados[:completos], dtype=tipo).astype(np.float32).reshape(-1, canais)
+            yield bloco.mean(axis=1) / escala
+
+def _ler_com_ffmpeg_ao_vivo(fonte, espera_s, parar):
+    """Decodifica `fonte` (arquivo em gravação ou '-') com ffmpeg, entregando 16 kHz mono conforme chega."""
+    comando = ['ffmpeg', '-v', 'error']
+    if fonte == '-':
+        comando += ['-i', 'pipe:0']
+    else:
+        # -follow 1: no fim do arquivo o ffmpeg espera por mais dados;
+        # -rw_timeout encerra a leitura após `espera_s` segundos sem crescimento
+        comando += ['-follow', '1', '-rw_timeout', str(int(espera_s * 1_000_000)), '-i', f"file:{fonte}"]
+    comando += ['-f', 'f32le', '-ac', '1', '-ar', str(TAXA_WHISPER), '-']
+    processo = subprocess.Popen(comando, stdin=sys.stdin.buffer if fonte == '-' else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Em uma sessão longa o stderr não pode encher o pipe: guarda só as últimas linhas
+    erros = deque(maxlen=20)
+    leitor_erros = threading.Thread(
+        target=lambda: erros.extend(linha.decode(errors='replace').rstrip() for linha in processo.stderr),
+        name="ffmpeg-stderr", daemon=True)
+    leitor_erros.start()
+    recebido = False
+    try:
+        for bloco in _ler_pcm_ao_vivo(processo.stdout, 'f32le', 1, parar=parar):
+            recebido = True
+            yield bloco
+    finally:
+        if processo.poll() is None:
+            processo.terminate()
+        processo.stdout.close()
+        processo.wait()
+        leitor_erros.join(timeout=1)
+
+    if processo.returncode != 0 and not recebido and not (parar is not None and parar.is_set()):
+        raise RuntimeError(f"ffmpeg falhou ao ler {fonte}: {' '.join(erros)}")
+
+def ler_fluxo_ao_vivo(fonte, entrada_bruta=None, espera_s=10.0, parar=None):
+    """
+    Lê um arquivo ainda em gravação (ou stdin, com `fonte` '-') à medida que o áudio chega.
+
+    Retorna (taxa de amostragem, gerador de blocos mono float32). Sem
+    `entrada_bruta`, um processo ffmpeg decodifica a fonte já em 16 kHz; com
+    `entrada_bruta` (formato, taxa, canais), os bytes PCM são lidos
+    diretamente, sem ffmpeg. Um arquivo é dado como encerrado após `espera_s`
+    segundos sem crescer; stdin, no fim do fluxo. `parar` (threading.Event)
+    encerra a leitura antes disso.
+    """
+    if entrada_bruta is None:
+        return TAXA_WHISPER, _ler_com_ffmpeg_ao_vivo(fonte, espera_s, parar)
+
+    formato, taxa, canais = entrada_bruta
+
+    def blocos():
+        if fonte == '-':
+            yield from _ler_pcm_ao_vivo(sys.stdin.buffer, formato, canais, parar=parar)
+            return
+        with open(fonte, 'rb') as arquivo:
+            yield from _ler_pcm_ao_vivo(arquivo, formato, canais, espera_s, parar)
+
+    return taxa, blocos()
+
+def janelas_ao_vivo(blocos, amostras_janela):
+    """
+    Agrupa os blocos que chegam aos poucos em janelas de `amostras_janela` amostras.
+
+    Cada janela é entregue assim que fica completa, como (janela, instante
+    de chegada em time.perf_counter()); a última pode ser menor.
+    """
+    import numpy as np
+    pendentes = []
+    acumulado = 0
+    for bloco in blocos:
+        pendentes.append(bloco)
+        acumulado += len(bloco)
+        while acumulado >= amostras_janela:
+            dados = np.concatenate(pendentes)
+            yield dados[:amostras_janela], time.perf_counter()
+            resto = dados[amostras_janela:]
+            pendentes = [resto] if len(resto) else []
+            acumulado = len(resto)
+    if acumulado:
+        yield np.concatenate(pendentes), time.perf_counter()
+
+def transcrever_ao_vivo(fonte, nome_base, modelo_whisper=None, opcoes=None, janela_s=30, entrada_bruta=None,
+                        espera_s=10):
+    """
+    Transcreve um arquivo ainda em gravação (ou stdin, com `fonte` '-') com atraso limitado.
+
+    O áudio é cortado em janelas de `janela_s` segundos assim que chega (ver
+    `ler_fluxo_ao_vivo`), e cada janela é transcrita e anexada à transcrição
+    (diário e arquivo legível) sem esperar o fim da gravação. O atraso de
+    cada janela, da chegada da última amostra ao texto gravado, é mostrado
+    e, com `opcoes.relatorio`, registrado por segmento e resumido. O primeiro
+    Ctrl+C para a leitura e transcreve o áudio já recebido; o segundo interrompe.
+    """
+    opcoes = opcoes or OpcoesTranscricao()
+    relatorio = opcoes.relatorio
+    parar = threading.Event()
+
+    def ao_interromper(sinal, quadro):
+        if parar.is_set():
+            raise KeyboardInterrupt
+        print("\n🛑 Encerrando a leitura: transcrevendo o áudio já recebido (Ctrl+C de novo para interromper)")
+        parar.set()
+
+    # Sinais só podem ser tratados na thread principal
+    sinal_anterior = None
+    if threading.current_thread() is threading.main_thread():
+        sinal_anterior = signal.signal(signal.SIGINT, ao_interromper)
+    try:
+        if modelo_whisper is None and opcoes.workers <= 1:
+            print("❌ Modelo Whisper necessário para transcrição ao vivo")
+            return False
+
+        origem = 'stdin' if fonte == '-' else fonte
+        print(f"🎙️ Acompanhando: {origem} (janelas de {janela_s:g}s)")
+        if fonte != '-':
+            print(f"📊 Leitura encerrada após {espera_s:g}s sem o arquivo crescer (ou Ctrl+C)")
+        pasta_saida = criar_pasta_saida(nome_base)
+        taxa, blocos = ler_fluxo_ao_vivo(fonte, entrada_bruta, espera_s, parar)
+
+        # Instante em que cada janela ficou completa, para medir o atraso até o texto
+        chegadas = {}
+        atrasos = []
+        recebido_s = 0.0
+
+        def janelas():
+            nonlocal recebido_s
+            decorrido = 0
+            # Fila sem limite: a leitura nunca para enquanto o Whisper trabalha,
+            # senão um gravador escrevendo no pipe ficaria bloqueado
+            for numero, (janela, chegada) in enumerate(
+                    pre_carregar(janelas_ao_vivo(blocos, int(round(janela_s * taxa))), tamanho_fila=0), 1):
+                chegadas[numero] = chegada
+                with medir_etapa(relatorio, 'reamostragem'):
+                    segmento = preparar_audio_whisper(janela, taxa)
+                yield segmento, len(janela) / taxa, decorrido / taxa, 0.0, 0.0
+                decorrido += len(janela)
+                recebido_s = decorrido / taxa
+
+        def ao_concluir_janela(processados, total):
+            atraso = time.perf_counter() - chegadas.pop(processados)
+            atrasos.append(atraso)
+            print(f"⏱️ Janela {processados:02d}: texto gravado {atraso:.1f}s após a chegada do áudio")
+            if relatorio is not None:
+                relatorio.anotar_segmento(processados, atraso_s=round(atraso, 4))
+            if opcoes.ao_progredir is not None:
+                opcoes.ao_progredir(processados, total)
+
+        sucesso = transcrever_completa_com_progresso(origem, modelo_whisper, pasta_saida, nome_base, janelas(),
+                                                   replace(opcoes, ao_progredir=ao_concluir_janela),
+                                                   # Cada janela sai assim que transcrita, para não somar atraso
+                                                   juntar_segmentos=False)
+
+        resumo_atraso = estatisticas_latencia(atrasos)
+        if relatorio is not None:
+            relatorio.duracao_audio_s = recebido_s
+            relatorio.extras['atraso_janela_s'] = resumo_atraso
+        if resumo_atraso is not None:
+            print(f"⏱️ Atraso por janela: média {resumo_atraso['media']:.1f}s | p95 {resumo_atraso['p95']:.1f}s | "
+                  f"máx {resumo_atraso['max']:.1f}s ({recebido_s:.1f}s de áudio recebidos)")
+        if sucesso:
+            print(f"📁 Transcrição salva em: {pasta_saida}")
+        return sucesso
+
+    except Exception as e:
+        print(f"❌ Erro na transcrição ao vivo: {str(e)}")
+        return False
+    finally:
+        parar.set()
+        if sinal_anterior is not None:
+            signal.signal(signal.SIGINT, sinal_anterior)
+
+def expandir_entradas(entradas):
+    """
+    Expande as entradas da linha de comando em uma lista de arquivos.
+
+    Pastas viram os arquivos de áudio contidos nelas (pelas extensões em
+    EXTENSOES_VALIDAS), padrões glob são expandidos e caminhos comuns são
+    mantidos como estão. Arquivos repetidos aparecem uma única vez.
+    """
+    arquivos = []
+    vistos = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(os.path.join(entrada, nome) for nome in os.listdir(entrada)
+                                if Path(nome).suffix.lower() in EXTENSOES_VALIDAS)
+        elif glob.has_magic(entrada):
+            candidatos = sorted(c for c in glob.glob(entrada, recursive=True) if os.path.isfile(c))
+        else:
+            candidatos = [entrada]
+        for candidato in candidatos:
+            chave = os.path.abspath(candidato)
+            if chave not in vistos:
+                vistos.add(chave)
+                arquivos.append(candidato)
+    return arquivos
+
+def encontrar_nomes_repetidos(arquivos):
+    """
+    Agrupa os arquivos que gravariam na mesma pasta de saída.
+
+    A pasta `<nome>_dividido` é criada no diretório atual a partir do nome
+    do arquivo sem extensão, então `a/aula.wav` e `b/aula.m4a` colidiriam.
+    Retorna {nome: [arquivos]} apenas para os nomes repetidos.
+    """
+    por_nome = defaultdict(list)
+    for arquivo in arquivos:
+        por_nome[Path(arquivo).stem].append(arquivo)
+    return {nome: lista for nome, lista in por_nome.items() if len(lista) > 1}
+
+def ordenar_por_duracao(arquivos):
+    """Ordena os arquivos do mais longo para o mais curto (arquivos ilegíveis vão para o fim)."""
+    duracoes = {}
+    for arquivo in arquivos:
+        try:
+            duracoes[arquivo] = obter_info_audio(arquivo)[1]
+        except Exception:
+            duracoes[arquivo] = -1
+    return sorted(arquivos, key=lambda arquivo: duracoes[arquivo], reverse=True)
+
+def imprimir_resumo_lote(resumo):
+    """Mostra o resultado e o tempo de cada arquivo do lote."""
+    print("\n📋 Resumo do lote")
     print("=" * 50)
+    for arquivo, sucesso, segundos in resumo:
+        print(f"{'✅' if sucesso else '❌'} {arquivo} ({segundos:.1f}s)")
+    concluidos = sum(1 for _, sucesso, _ in resumo if sucesso)
+    print(f"📊 {concluidos}/{len(resumo)} arquivos processados com sucesso "
+          f"em {sum(segundos for _, _, segundos in resumo):.1f}s")
+
+def processar_arquivo(arquivo_entrada, args, modelo_whisper=None, cache=None, pool=None, ao_progredir=None,
+                      carregamento_modelo_s=None, pool_exportacao=None, calibracao=None):
+    """
+    Processa um arquivo conforme as opções da linha de comando. Retorna True em caso de sucesso.
+
+    `ao_progredir(processados, total)` recebe o progresso por segmento (usado pelo modo --servir).
+    Com `args.relatorio`, o relatório de execução é salvo na pasta de saída;
+    `carregamento_modelo_s` é o tempo gasto carregando o modelo, pago uma vez por execução.
+    `pool_exportacao` é o pool de processos de --jobs, reaproveitado entre arquivos.
+    Com `calibracao` (--auto, ver `calibrar_automaticamente`), a duração dos
+    segmentos é escolhida para o arquivo no lugar de `args.segmentos`.
+    """
+    ao_vivo = getattr(args, 'ao_vivo', False)
     
-    # Configura argumentos de linha de comando
+    # Verifica se o arquivo existe ('-' é stdin no modo --ao-vivo)
+    if not (ao_vivo and arquivo_entrada == '-') and not os.path.exists(arquivo_entrada):
+        print(f"❌ Erro: Arquivo não encontrado: {arquivo_entrada}")
+        return False
+    
+    # Verifica se é um arquivo de áudio
+    extensao_arquivo = Path(arquivo_entrada).suffix.lower()
+    
+    if not ao_vivo and extensao_arquivo not in EXTENSOES_VALIDAS:
+        print(f"⚠️  Aviso: Extensão '{extensao_arquivo}' pode não ser suportada.")
+        print(f"   Extensões recomendadas: {', '.join(EXTENSOES_VALIDAS)}")
+    
+    print(f"\n🎯 Processando: {arquivo_entrada}")
+    print("-" * 40)
+    
+    nome_base = Path(arquivo_entrada).stem
+    if ao_vivo and arquivo_entrada == '-':
+        nome_base = time.strftime('ao_vivo_%Y%m%d_%H%M%S')
+    
+    relatorio = None
+    if getattr(args, 'relatorio', False):
+        modo = modo_dos_argumentos(args)
+        relatorio = RelatorioExecucao(arquivo_entrada, modo,
+                                      args.modelo if modo not in ('dividir', 'copy') else None,
+                                      carregamento_modelo_s)
+    
+    duracao_segmento_min = args.segmentos
+    if calibracao is not None and (args.transcrever_completa or args.transcrever):
+        duracao_segmento_min = duracao_segmento_automatica(arquivo_entrada, calibracao, f"{nome_base}_dividido",
+                                                           nome_base, args.recomecar,
+                                                           getattr(args, 'sobreposicao', 0))
+        if relatorio is not None:
+            relatorio.extras['auto'] = dict(calibracao, duracao_segmento_min=duracao_segmento_min)
+    
+    # PCM em disco: decodificação reaproveitada entre execuções (não se aplica ao --copy)
+    armazem_pcm = None
+    if getattr(args, 'pcm_em_disco', False) and not args.copy and not ao_vivo:
+        armazem_pcm = ArmazemPCM(os.path.join(args.cache_dir, 'pcm'), args.pcm_max_mb)
+    
+    # Executa a divisão/transcrição
+    if args.copy:
+        sucesso = dividir_audio_sem_recodificar(arquivo_entrada, duracao_segmento_min)
+    elif ao_vivo:
+        sucesso = transcrever_ao_vivo(arquivo_entrada, nome_base, modelo_whisper,
+                                      OpcoesTranscricao.dos_argumentos(args, cache=cache, pool=pool,
+                                                                       relatorio=relatorio,
+                                                                       ao_progredir=ao_progredir),
+                                      janela_s=args.janela_ao_vivo, entrada_bruta=args.entrada_bruta,
+                                      espera_s=args.espera_ao_vivo)
+    elif args.transcrever_completa:
+        # Nova funcionalidade: dividir e transcrever tudo em um arquivo
+        sucesso = dividir_e_transcrever_completa(arquivo_entrada, duracao_segmento_min, modelo_whisper,
+                                                 OpcoesTranscricao.dos_argumentos(args, cache=cache, pool=pool,
+                                                                                  relatorio=relatorio,
+                                                                                  armazem_pcm=armazem_pcm,
+                                                                                  ao_progredir=ao_progredir))
+    else:
+        sucesso = dividir_audio(arquivo_entrada, duracao_segmento_min=duracao_segmento_min,
+                                transcrever=args.transcrever,
+                                apenas_transcrever=args.apenas_transcrever,
+                                modelo_whisper=modelo_whisper,
+                                streaming=args.streaming,
+                                nome_modelo=args.modelo, cache=cache,
+                                vad=args.vad, tolerancia_corte_s=args.tolerancia_corte,
+                                limiar_fala=args.limiar_fala, ao_progredir=ao_progredir,
+                                relatorio=relatorio, jobs=getattr(args, 'jobs', None),
+                                pool_exportacao=pool_exportacao, armazem_pcm=armazem_pcm)
+    
+    if relatorio is not None:
+        pasta_saida = f"{nome_base}_dividido"
+        os.makedirs(pasta_saida, exist_ok=True)
+        caminho_relatorio = obter_caminho_relatorio(pasta_saida, nome_base)
+        resumo = relatorio.salvar(caminho_relatorio, sucesso)
+        vazao = f" | {resumo['audio_s_por_s']:.1f}s de áudio por segundo" if resumo['audio_s_por_s'] else ""
+        print(f"📈 Relatório salvo: {caminho_relatorio}{vazao}")
+    return sucesso
+
+def modo_dos_argumentos(args):
+    """Nome do modo de processamento (MODOS_TRABALHO) correspondente às flags da linha de comando."""
+    if args.copy:
+        return 'copy'
+    if getattr(args, 'ao_vivo', False):
+        return 'ao_vivo'
+    if args.transcrever_completa:
+        return 'completa'
+    if args.apenas_transcrever:
+        return 'apenas_transcrever'
+    if args.transcrever:
+        return 'transcrever'
+    return 'dividir'
+
+def opcoes_do_modo(modo):
+    """Flags da linha de comando equivalentes a um modo de MODOS_TRABALHO."""
+    return {
+        'copy': modo == 'copy',
+        'transcrever_completa': modo == 'completa',
+        'apenas_transcrever': modo == 'apenas_transcrever',
+        'transcrever': modo == 'transcrever',
+    }
+
+def _numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def validar_opcoes_trabalho(opcoes, segmentos_padrao):
+    """Confere tipo e faixa das opções de um job do --servir, com as mesmas regras da linha de comando (ValueError)."""
+    for chave in ('vad', 'streaming', 'recomecar'):
+        if chave in opcoes and not isinstance(opcoes[chave], bool):
+            raise ValueError(f"{chave} precisa ser true ou false")
+    if 'modelo' in opcoes and opcoes['modelo'] not in MODELOS_WHISPER:
+        raise ValueError(f"Modelo inválido: {opcoes['modelo']} (use {', '.join(MODELOS_WHISPER)})")
+    segmentos = opcoes.get('segmentos', segmentos_padrao)
+    if not isinstance(segmentos, int) or isinstance(segmentos, bool) or segmentos <= 0:
+        raise ValueError("segmentos precisa ser um número inteiro de minutos maior que zero")
+    if 'tolerancia_corte' in opcoes and not (_numero(opcoes['tolerancia_corte']) and opcoes['tolerancia_corte'] >= 0):
+        raise ValueError("tolerancia_corte precisa ser um número de segundos maior ou igual a zero")
+    if 'limiar_fala' in opcoes and not (_numero(opcoes['limiar_fala']) and 0 <= opcoes['limiar_fala'] <= 1):
+        raise ValueError("limiar_fala precisa ser uma fração entre 0 e 1")
+    if 'sobreposicao' in opcoes and not (_numero(opcoes['sobreposicao'])
+                                         and 0 <= opcoes['sobreposicao'] < segmentos * 60):
+        raise ValueError("sobreposicao precisa ser um número de segundos menor que a duração de um segmento")
+
+class ServidorTranscricao:
+    """
+    Fila de jobs do modo --servir.
+
+    Os modelos Whisper ficam carregados em memória (um por nome de modelo) e
+    os jobs são executados um de cada vez por uma thread própria, com as
+    mesmas funções da linha de comando. A latência de cada job passa a ser só
+    o trabalho, sem a inicialização do Python/torch e o carregamento do modelo.
+    """
+
+    def __init__(self, args_padrao, cache=None):
+        self.args_padrao = args_padrao
+        self.cache = cache
+        self.modelos = {}
+        self.trabalhos = {}
+        self.fila = queue.Queue()
+        self.trava = threading.Lock()
+        threading.Thread(target=self._executar_fila, name="fila-trabalhos", daemon=True).start()
+
+    def obter_modelo(self, nome_modelo):
+        """Retorna o modelo residente, carregando-o na primeira vez."""
+        if nome_modelo not in self.modelos:
+            modelo_whisper = carregar_modelo_whisper(nome_modelo)
+            if modelo_whisper is None:
+                raise RuntimeError(f"Não foi possível carregar o modelo Whisper '{nome_modelo}'")
+            with self.trava:
+                self.modelos[nome_modelo] = modelo_whisper
+        return self.modelos[nome_modelo]
+
+    def enviar(self, pedido):
+        """Valida e enfileira um job. Retorna uma cópia do job criado."""
+        if not isinstance(pedido, dict):
+            raise ValueError("O corpo do pedido precisa ser um objeto JSON")
+        arquivo = pedido.get('arquivo')
+        modo = pedido.get('modo', 'completa')
+        if not isinstance(arquivo, str) or not os.path.isfile(arquivo):
+            raise ValueError(f"Arquivo não encontrado: {arquivo}")
+        if not isinstance(modo, str) or modo not in MODOS_TRABALHO:
+            raise ValueError(f"Modo inválido: {modo} (use {', '.join(MODOS_TRABALHO)})")
+        opcoes = {chave: pedido[chave] for chave in OPCOES_TRABALHO if chave in pedido}
+        validar_opcoes_trabalho(opcoes, self.args_padrao.segmentos)
+
+        trabalho = {
+            'id': uuid.uuid4().hex,
+            'arquivo': os.path.abspath(arquivo),
+            'modo': modo,
+            'opcoes': opcoes,
+            'status': 'na_fila',
+            'progresso': {'processados': 0, 'total': None},
+            'resultado': None,
+            'erro': None,
+            'criado_em': time.time(),
+            'iniciado_em': None,
+            'concluido_em': None,
+        }
+        with self.trava:
+            self.trabalhos[trabalho['id']] = trabalho
+            copia = json.loads(json.dumps(trabalho))
+        self.fila.put(trabalho['id'])
+        return copia
+
+    def consultar(self, id_trabalho):
+        """Cópia do estado atual de um job, ou None."""
+        with self.trava:
+            trabalho = self.trabalhos.get(id_trabalho)
+            return json.loads(json.dumps(trabalho)) if trabalho is not None else None
+
+    def listar(self):
+        with self.trava:
+            return [{'id': t['id'], 'arquivo': t['arquivo'], 'modo': t['modo'], 'status': t['status']}
+                    for t in self.trabalhos.values()]
+
+    def _executar_fila(self):
+        while True:
+            id_trabalho = self.fila.get()
+            with self.trava:
+                trabalho = self.trabalhos[id_trabalho]
+                trabalho['status'] = 'processando'
+                trabalho['iniciado_em'] = time.time()
+            try:
+                sucesso, resultado = self._executar(trabalho)
+                erro = None if sucesso else "Processamento falhou (veja o log do servidor)"
+            except Exception as e:
+                sucesso, resultado, erro = False, None, str(e)
+            with self.trava:
+                trabalho['status'] = 'concluido' if sucesso else 'falhou'
+                trabalho['resultado'] = resultado
+                trabalho['erro'] = erro
+                trabalho['concluido_em'] = time.time()
+
+    def _executar(self, trabalho):
+        args = argparse.Namespace(**vars(self.args_padrao))
+        for chave, valor in trabalho['opcoes'].items():
+            setattr(args, chave, valor)
+        for chave, valor in opcoes_do_modo(trabalho['modo']).items():
+            setattr(args, chave, valor)
+        # O servidor usa os modelos residentes, em um único processo
+        args.workers = 1
+
+        modelo_whisper = None
+        if trabalho['modo'] not in ('dividir', 'copy'):
+            modelo_whisper = self.obter_modelo(args.modelo)
+
+        def ao_progredir(processados, total):
+            with self.trava:
+                trabalho['progresso'] = {'processados': processados, 'total': total}
+
+        sucesso = processar_arquivo(trabalho['arquivo'], args, modelo_whisper, self.cache,
+                                    ao_progredir=ao_progredir)
+
+        nome_base = Path(trabalho['arquivo']).stem
+        pasta_saida = os.path.abspath(f"{nome_base}_dividido")
+        resultado = {'pasta_saida': pasta_saida}
+        caminho_completo = os.path.join(pasta_saida, f"{nome_base}_transcricao_completa.txt")
+        if trabalho['modo'] in ('completa', 'apenas_transcrever') and os.path.exists(caminho_completo):
+            resultado['transcricao'] = caminho_completo
+            with open(caminho_completo, 'r', encoding='utf-8') as f:
+                resultado['texto'] = f.read()
+        return sucesso, resultado
+
+def servir(args):
+    """Inicia o servidor HTTP local (modo --servir). Bloqueia até Ctrl+C."""
+    cache = None if args.sem_cache else CacheTranscricoes(args.cache_dir, args.cache_max_mb)
+    servidor_trabalhos = ServidorTranscricao(args, cache)
+    # Deixa o modelo padrão residente antes do primeiro job
+    servidor_trabalhos.obter_modelo(args.modelo)
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def _responder(self, codigo, dados):
+            corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+            self.send_response(codigo)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            partes = [parte for parte in self.path.split('/') if parte]
+            if partes == ['saude']:
+                with servidor_trabalhos.trava:
+                    modelos_carregados = sorted(servidor_trabalhos.modelos)
+                self._responder(200, {'status': 'ok', 'modelos_carregados': modelos_carregados})
+            elif partes == ['trabalhos']:
+                self._responder(200, servidor_trabalhos.listar())
+            elif len(partes) == 2 and partes[0] == 'trabalhos':
+                trabalho = servidor_trabalhos.consultar(partes[1])
+                if trabalho is None:
+                    self._responder(404, {'erro': 'Job não encontrado'})
+                else:
+                    self._responder(200, trabalho)
+            else:
+                self._responder(404, {'erro': 'Rota não encontrada'})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/trabalhos':
+                self._responder(404, {'erro': 'Rota não encontrada'})
+                return
+            try:
+                tamanho = int(self.headers.get('Content-Length', 0))
+                pedido = json.loads(self.rfile.read(tamanho) or b'{}')
+                trabalho = servidor_trabalhos.enviar(pedido)
+            except (ValueError, json.JSONDecodeError) as e:
+                self._responder(400, {'erro': str(e)})
+                return
+            self._responder(202, trabalho)
+
+        def log_message(self, formato, *argumentos):
+            pass
+
+    servidor_http = ThreadingHTTPServer((args.host, args.porta), Manipulador)
+    print(f"🛰️ Servidor de transcrição em http://{args.host}:{args.porta}")
+    print("   POST /trabalhos  {\"arquivo\": ..., \"modo\": ..., \"segmentos\": ...}")
+    print("   GET  /trabalhos/<id>  |  GET /trabalhos  |  GET /saude")
+    try:
+        servidor_http.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor encerrado")
+    finally:
+        servidor_http.server_close()
+        if cache is not None:
+            cache.fechar()
+
+def _requisitar_json(url, dados=None):
+    """GET (ou POST, se houver `dados`) com corpo JSON. Retorna o JSON da resposta."""
+    corpo = json.dumps(dados).encode('utf-8') if dados is not None else None
+    requisicao = urllib.request.Request(url, data=corpo, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(requisicao) as resposta:
+            return json.loads(resposta.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read()).get('erro', str(e))) from None
+
+def enviar_para_servidor(url_servidor, arquivo_entrada, modo, opcoes, intervalo_s=2.0):
+    """Envia um arquivo ao servidor (--servidor), acompanha o progresso e retorna o job final."""
+    url_servidor = url_servidor.rstrip('/')
+    pedido = dict(opcoes, arquivo=os.path.abspath(arquivo_entrada), modo=modo)
+    trabalho = _requisitar_json(f"{url_servidor}/trabalhos", pedido)
+    print(f"📨 Job {trabalho['id']} enviado: {arquivo_entrada} ({modo})")
+
+    ultimo_progresso = None
+    while trabalho['status'] in ('na_fila', 'processando'):
+        time.sleep(intervalo_s)
+        trabalho = _requisitar_json(f"{url_servidor}/trabalhos/{trabalho['id']}")
+        progresso = (trabalho['status'], trabalho['progresso']['processados'], trabalho['progresso']['total'])
+        if progresso != ultimo_progresso:
+            status, processados, total = progresso
+            print(f"🔄 {status}: {processados}/{total if total is not None else '?'} segmentos")
+            ultimo_progresso = progresso
+
+    if trabalho['status'] == 'concluido':
+        print(f"✅ Concluído: {trabalho['resultado']['pasta_saida']}")
+    else:
+        print(f"❌ Falhou: {trabalho['erro']}")
+    return trabalho
+
+def criar_parser():
+    """Cria o parser de argumentos da linha de comando."""
     parser = argparse.ArgumentParser(description='Divide arquivos de áudio e transcreve com IA')
-    parser.add_argument('arquivo', help='Arquivo de áudio para processar')
+    parser.add_argument('arquivos', nargs='*', metavar='arquivo',
+                        help='Arquivos de áudio, padrões glob (ex.: "gravacoes/*.m4a") ou pastas para processar')
     parser.add_argument('--transcrever', action='store_true', help='Transcrever cada segmento individualmente')
     parser.add_argument('--apenas-transcrever', action='store_true', help='Apenas transcrever arquivo completo')
     parser.add_argument('--transcrever-completa', action='store_true', help='Dividir e transcrever tudo em um arquivo único')
-    parser.add_argument('--modelo', default='base', choices=['tiny', 'base', 'small', 'medium', 'large'],
+    parser.add_argument('--modelo', default='base', choices=MODELOS_WHISPER,
                        help='Modelo Whisper a usar (padrão: base)')
     parser.add_argument('--segmentos', type=int, default=4, help='Duração de cada segmento em minutos (padrão: 4 min/segmento)')
+    parser.add_argument('--auto', action='store_true',
+                       help='Medir a velocidade de transcrição em um trecho do arquivo e escolher a duração dos '
+                            'segmentos (ignora --segmentos); com --prazo ou --rtf-alvo, escolher também o modelo')
+    parser.add_argument('--prazo', type=float, metavar='SEGUNDOS',
+                       help='Com --auto, usar o maior modelo que transcreve o arquivo nesse tempo')
+    parser.add_argument('--rtf-alvo', type=float, metavar='FATOR',
+                       help='Com --auto, usar o maior modelo que gasta no máximo FATOR segundos por segundo de áudio '
+                            '(ex.: 0.5 = duas vezes mais rápido que o tempo real)')
+    parser.add_argument('--sobreposicao', type=float, default=0, metavar='SEGUNDOS',
+                       help='Sobreposição entre janelas vizinhas na transcrição completa, em segundos; o texto é '
+                            'emendado pelos tempos do Whisper (padrão: 0)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Processos de transcrição em paralelo, cada um com seu modelo (com --transcrever-completa)')
+    parser.add_argument('--lote-whisper', type=int, default=None, metavar='N',
+                       help='Decodificar N janelas de 30s por passada do modelo (motor em lote, com '
+                            '--transcrever-completa ou --ao-vivo; padrão: transcribe do Whisper, uma janela por vez)')
+    parser.add_argument('--jobs', type=int, default=None, metavar='N',
+                       help='Exportar os segmentos M4A em N processos paralelos (divisão; padrão: 2 threads no próprio processo)')
+    parser.add_argument('--sem-cache', action='store_true', help='Não consultar nem gravar o cache de transcrições')
+    parser.add_argument('--cache-dir', default=PASTA_CACHE_PADRAO,
+                       help=f'Pasta do cache de transcrições (padrão: {PASTA_CACHE_PADRAO})')
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                       help='Tamanho máximo do cache em MB; as entradas menos usadas são descartadas (padrão: 512)')
+    parser.add_argument('--pcm-em-disco', action='store_true',
+                       help='Guardar o áudio decodificado em disco (float32, mapeado em memória) e reaproveitá-lo '
+                            'entre execuções, inclusive com outro --segmentos')
+    parser.add_argument('--pcm-max-mb', type=float, default=4096,
+                       help='Espaço máximo do PCM em disco (em <cache-dir>/pcm), em MB (padrão: 4096)')
+    parser.add_argument('--recomecar', action='store_true',
+                       help='Ignorar o manifesto de uma execução anterior e transcrever tudo de novo')
+    parser.add_argument('--gerar-do-diario', action='store_true',
+                       help='Apenas regenerar os arquivos de transcrição a partir do diário (.jsonl) já existente')
+    parser.add_argument('--copy', action='store_true',
+                       help='Apenas dividir, copiando o áudio no codec original (sem decodificar/recodificar)')
+    parser.add_argument('--vad', action='store_true',
+                       help='Cortar segmentos nas pausas e não transcrever segmentos sem fala (análise de energia)')
+    parser.add_argument('--tolerancia-corte', type=float, default=10,
+                       help='Quanto cada corte pode se mover para cair em uma pausa, em segundos (com --vad, padrão: 10)')
+    parser.add_argument('--limiar-fala', type=float, default=0.1,
+                       help='Fração mínima de quadros com fala para transcrever um segmento (com --vad, padrão: 0.1)')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Ler o áudio em blocos do tamanho de um segmento (memória constante para arquivos longos)')
+    parser.add_argument('--ao-vivo', action='store_true',
+                       help='Transcrever um arquivo ainda em gravação (ou stdin, com "-") à medida que o áudio chega, '
+                            'anexando cada janela à transcrição completa')
+    parser.add_argument('--janela-ao-vivo', type=float, default=30, metavar='SEGUNDOS',
+                       help='Duração de cada janela transcrita no modo --ao-vivo (padrão: 30)')
+    parser.add_argument('--espera-ao-vivo', type=float, default=10, metavar='SEGUNDOS',
+                       help='Encerrar o --ao-vivo depois de tantos segundos sem o arquivo crescer (padrão: 10)')
+    parser.add_argument('--entrada-bruta', type=interpretar_entrada_bruta, metavar='FORMATO:TAXA:CANAIS',
+                       help='No --ao-vivo, ler PCM bruto sem ffmpeg (ex.: s16le:16000:1; formatos: s16le, f32le)')
+    parser.add_argument('--relatorio', action='store_true',
+                       help='Salvar na pasta de saída um relatório JSON lines com tempo por etapa, latência por segmento e memória')
+    parser.add_argument('--perfil', metavar='ARQUIVO',
+                       help='Capturar um perfil da execução (cProfile .prof, ou HTML com --perfilador pyinstrument)')
+    parser.add_argument('--perfilador', default='cprofile', choices=['cprofile', 'pyinstrument'],
+                       help='Perfilador usado com --perfil (padrão: cprofile)')
+    parser.add_argument('--servir', action='store_true',
+                       help='Iniciar o servidor local de transcrição, com modelos residentes e fila de jobs')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço do servidor (com --servir, padrão: 127.0.0.1)')
+    parser.add_argument('--porta', type=int, default=8765, help='Porta do servidor (com --servir, padrão: 8765)')
+    parser.add_argument('--servidor', metavar='URL',
+                       help='Enviar os arquivos para um servidor já iniciado (ex.: http://127.0.0.1:8765)')
+    return parser
+
+def main():
+    """Função principal do script."""
+    print("🎵 Divisor de Arquivos de Áudio com Transcrição")
+    print("=" * 50)
     
+    # Configura argumentos de linha de comando
+    parser = criar_parser()
     args = parser.parse_args()
     
-    # Verifica dependências
-    if not verificar_dependencias():
+    # Valem também para o --servir, cujos jobs herdam esses valores
+    if args.segmentos <= 0:
+        print("❌ Erro: --segmentos precisa ser maior que zero")
+        sys.exit(1)
+    if args.lote_whisper is not None and args.lote_whisper < 1:
+        print("❌ Erro: --lote-whisper precisa ser pelo menos 1")
+        sys.exit(1)
+    if args.jobs is not None and args.jobs < 1:
+        print("❌ Erro: --jobs precisa ser pelo menos 1")
+        sys.exit(1)
+    
+    # Servidor local com modelos residentes
+    if args.servir:
+        if not verificar_dependencias(DEPENDENCIAS_TRANSCRICAO):
+            sys.exit(1)
+        servir(args)
+        return
+    
+    if not args.arquivos:
+        parser.error("informe ao menos um arquivo (ou use --servir)")
+    
+    if args.ao_vivo:
+        # Uma única fonte, usada como está: o arquivo pode ainda estar sendo gravado, e '-' é stdin
+        if len(args.arquivos) != 1:
+            parser.error("--ao-vivo acompanha uma única entrada (arquivo em gravação ou '-' para stdin)")
+        if args.servidor or args.copy or args.gerar_do_diario:
+            parser.error("--ao-vivo não pode ser usado com --servidor, --copy ou --gerar-do-diario")
+        if args.janela_ao_vivo <= 0 or args.espera_ao_vivo <= 0:
+            parser.error("--janela-ao-vivo e --espera-ao-vivo precisam ser positivos")
+    elif args.entrada_bruta is not None:
+        print("⚠️  --entrada-bruta só é usado com --ao-vivo; ignorando")
+    
+    if (args.prazo is not None or args.rtf_alvo is not None) and not args.auto:
+        parser.error("--prazo e --rtf-alvo são usados com --auto")
+    if args.prazo is not None and args.rtf_alvo is not None:
+        parser.error("use --prazo ou --rtf-alvo, não os dois")
+    if args.auto and not (args.transcrever or args.apenas_transcrever or args.transcrever_completa):
+        parser.error("--auto calibra a transcrição: use com --transcrever, --apenas-transcrever ou --transcrever-completa")
+    if args.auto and (args.ao_vivo or args.servidor):
+        parser.error("--auto não pode ser usado com --ao-vivo ou --servidor")
+    if any(valor is not None and valor <= 0 for valor in (args.prazo, args.rtf_alvo)):
+        parser.error("--prazo e --rtf-alvo precisam ser positivos")
+    
+    arquivos = list(args.arquivos) if args.ao_vivo else expandir_entradas(args.arquivos)
+    if not arquivos:
+        print("❌ Erro: Nenhum arquivo de áudio encontrado nas entradas informadas")
         sys.exit(1)
     
-    arquivo_entrada = args.arquivo
+    # Arquivos com o mesmo nome (em pastas diferentes) sobrescreveriam a mesma pasta de saída
+    repetidos = encontrar_nomes_repetidos(arquivos)
+    if repetidos:
+        print("❌ Erro: Arquivos com o mesmo nome gravariam na mesma pasta de saída:")
+        for nome, lista in repetidos.items():
+            print(f"   {nome}_dividido ← {', '.join(lista)}")
+        print("   Processe-os em execuções separadas, a partir de diretórios diferentes, ou renomeie-os")
+        sys.exit(1)
     
-    # Verifica se o arquivo existe
-    if not os.path.exists(arquivo_entrada):
-        print(f"❌ Erro: Arquivo não encontrado: {arquivo_entrada}")
+    # Regenera as transcrições legíveis a partir do diário, sem processar áudio
+    if args.gerar_do_diario:
+        falhas = 0
+        for arquivo in arquivos:
+            nome_base = Path(arquivo).stem
+            pasta_saida = f"{nome_base}_dividido"
+            if not os.path.exists(obter_caminho_diario(pasta_saida, nome_base)):
+                print(f"❌ Erro: Diário não encontrado em: {pasta_saida}")
+                falhas += 1
+                continue
+            processados, total = gerar_transcricoes_do_diario(pasta_saida, nome_base)
+            print(f"✓ Transcrições regeneradas em '{pasta_saida}' ({processados}/{total} segmentos)")
+        if falhas:
+            sys.exit(1)
+        return
+    
+    transcricao_solicitada = (args.transcrever or args.apenas_transcrever or args.transcrever_completa
+                              or args.ao_vivo)
+    if args.copy and transcricao_solicitada:
+        print("❌ Erro: --copy é apenas para divisão, sem transcrição")
         sys.exit(1)
     
-    # Verifica se é um arquivo de áudio
-    extensoes_validas = ['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.wma']
-    extensao_arquivo = Path(arquivo_entrada).suffix.lower()
+    # Cliente: o trabalho é feito por um servidor já aquecido (--servir)
+    if args.servidor:
+        # Só as opções informadas pelo usuário: as demais ficam com os padrões do servidor (ex.: --modelo do --servir)
+        opcoes = {chave: getattr(args, chave) for chave in OPCOES_TRABALHO
+                  if getattr(args, chave) != parser.get_default(chave)}
+        resumo = []
+        for arquivo_entrada in arquivos:
+            inicio = time.perf_counter()
+            try:
+                trabalho = enviar_para_servidor(args.servidor, arquivo_entrada, modo_dos_argumentos(args), opcoes)
+                sucesso = trabalho['status'] == 'concluido'
+            except (OSError, RuntimeError) as e:
+                print(f"❌ Erro ao falar com o servidor: {e}")
+                sucesso = False
+            resumo.append((arquivo_entrada, sucesso, time.perf_counter() - inicio))
+        if len(resumo) > 1:
+            imprimir_resumo_lote(resumo)
+        sys.exit(0 if all(sucesso for _, sucesso, _ in resumo) else 1)
     
-    if extensao_arquivo not in extensoes_validas:
-        print(f"⚠️  Aviso: Extensão '{extensao_arquivo}' pode não ser suportada.")
-        print(f"   Extensões recomendadas: {', '.join(extensoes_validas)}")
+    # Verifica dependências (apenas as do modo escolhido)
+    if args.copy:
+        dependencias = []
+    elif transcricao_solicitada:
+        dependencias = DEPENDENCIAS_TRANSCRICAO
+    else:
+        dependencias = DEPENDENCIAS_DIVISAO
+    if not verificar_dependencias(dependencias, precisa_ffmpeg=not (args.ao_vivo and args.entrada_bruta)):
+        sys.exit(1)
+    if args.perfil and args.perfilador == 'pyinstrument' and importlib.util.find_spec('pyinstrument') is None:
+        print("❌ Erro: pyinstrument não está instalado (pip install pyinstrument) — use --perfilador cprofile")
+        sys.exit(1)
     
-    print(f"\n🎯 Processando: {arquivo_entrada}")
-    print("-" * 40)
+    # Modo lote: os arquivos mais longos primeiro, para não deixar um arquivo enorme para o fim
+    if len(arquivos) > 1:
+        arquivos = ordenar_por_duracao(arquivos)
+        print(f"\n📦 Modo lote: {len(arquivos)} arquivos (mais longos primeiro)")
     
-    # Carrega modelo Whisper se necessário
+    # Custos fixos pagos uma única vez por execução: modelo Whisper (ou pool de processos) e cache
     modelo_whisper = None
-    if args.transcrever or args.apenas_transcrever or args.transcrever_completa:
+    pool = None
+    carregamento_modelo_s = None
+    transcricao_completa = args.transcrever_completa or args.ao_vivo
+    usar_workers = transcricao_completa and args.workers > 1
+    if args.workers > 1 and not transcricao_completa:
+        print("⚠️  --workers só é usado com --transcrever-completa; ignorando")
+    if args.sobreposicao and not 0 <= args.sobreposicao < (SEGMENTO_MAXIMO_AUTO_S if args.auto
+                                                           else args.segmentos * 60):
+        print("❌ Erro: --sobreposicao precisa ser positiva e menor que a duração de um segmento")
+        sys.exit(1)
+    if args.sobreposicao and (args.ao_vivo or not args.transcrever_completa):
+        print("⚠️  --sobreposicao só é usado com --transcrever-completa (sem --ao-vivo); ignorando")
+    if args.lote_whisper and not transcricao_completa:
+        print("⚠️  --lote-whisper só é usado com --transcrever-completa ou --ao-vivo; ignorando")
+        args.lote_whisper = None
+    pool_exportacao = None
+    if args.jobs is not None:
+        if args.copy or transcricao_completa or args.apenas_transcrever:
+            print("⚠️  --jobs só é usado na divisão com exportação M4A; ignorando")
+        else:
+            pool_exportacao = criar_pool_exportacao(args.jobs)
+    inicio_modelo = time.perf_counter()
+    calibracao = None
+    if args.auto:
+        # A calibração carrega o modelo (ou o pool) que será usado; em lote, mede no arquivo mais longo
+        try:
+            escolhido = calibrar_automaticamente(arquivos[0], args.modelo, args.workers if usar_workers else 1,
+                                                 args.prazo, args.rtf_alvo,
+                                                 args.sobreposicao if args.transcrever_completa else 0,
+                                                 args.lote_whisper)
+        except Exception as e:
+            print(f"❌ Erro na calibração do --auto: {e}")
+            sys.exit(1)
+        if escolhido is None:
+            print("❌ Não foi possível carregar o modelo Whisper")
+            sys.exit(1)
+        calibracao, modelo_whisper, pool = escolhido
+        args.modelo = calibracao['modelo']
+        carregamento_modelo_s = time.perf_counter() - inicio_modelo
+    elif transcricao_solicitada and not usar_workers:
         modelo_whisper = carregar_modelo_whisper(args.modelo)
         if modelo_whisper is None:
             print("❌ Não foi possível carregar o modelo Whisper")
             sys.exit(1)
+        carregamento_modelo_s = time.perf_counter() - inicio_modelo
+    elif usar_workers:
+        # Os processos carregam o modelo sob demanda; aqui só é medida a criação do pool
+        pool = criar_pool_transcricao(args.modelo, args.workers, args.lote_whisper)
+        carregamento_modelo_s = time.perf_counter() - inicio_modelo
     
-    # Executa a divisão/transcrição
-    if args.transcrever_completa:
-        # Nova funcionalidade: dividir e transcrever tudo em um arquivo
-        sucesso = dividir_e_transcrever_completa(arquivo_entrada, args.segmentos, modelo_whisper)
-    else:
-        sucesso = dividir_audio(arquivo_entrada, duracao_segmento_min=args.segmentos,
-                               transcrever=args.transcrever,
-                               apenas_transcrever=args.apenas_transcrever,
-                               modelo_whisper=modelo_whisper)
+    # Cache de transcrições (só faz sentido quando há transcrição)
+    cache = None
+    if transcricao_solicitada and not args.sem_cache:
+        cache = CacheTranscricoes(args.cache_dir, args.cache_max_mb)
+    
+    resumo = []
+    try:
+        with perfilar(args.perfil, args.perfilador) if args.perfil else contextlib.nullcontext():
+            for arquivo_entrada in arquivos:
+                inicio = time.perf_counter()
+                sucesso = processar_arquivo(arquivo_entrada, args, modelo_whisper, cache, pool,
+                                            carregamento_modelo_s=carregamento_modelo_s,
+                                            pool_exportacao=pool_exportacao, calibracao=calibracao)
+                resumo.append((arquivo_entrada, sucesso, time.perf_counter() - inicio))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if pool_exportacao is not None:
+            pool_exportacao.shutdown(cancel_futures=True)
+        if cache is not None:
+            print(cache.resumo())
+            cache.fechar()
+    
+    if len(resumo) > 1:
+        imprimir_resumo_lote(resumo)
     
-    if sucesso:
+    if all(sucesso for _, sucesso, _ in resumo):
         print("\n✅ Processo concluído com sucesso!")
     else:
         print("\n❌ Processo falhou!")
@@ -0,0 +1,86 @@
+"""Testes da calibração e das escolhas do --auto."""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import split_audio
+from split_audio import SEGMENTO_MAXIMO_AUTO_S, escolher_duracao_segmento, prever_tempo_transcricao
+
+# Segundos de processamento por segundo de áudio de cada modelo falso (sem custo fixo)
+VELOCIDADES = {'tiny': 0.01, 'base': 0.02, 'small': 0.05, 'medium': 0.1, 'large': 0.2}
+
+
+# prever_tempo_transcricao / escolher_duracao_segmento
+
+def test_previsao_junta_a_sobra_curta():
+    # 490 s em segmentos de 240 s: 2 chamadas (a sobra de 10 s vai para a última)
+    assert prever_tempo_transcricao(490, 240, 1.0, 0.1) == pytest.approx(2 * 1.0 + 0.1 * 490)
+
+def test_previsao_distribui_entre_processos():
+    assert prever_tempo_transcricao(480, 240, 0.0, 0.1, workers=2) == pytest.approx(24)
+
+def test_custo_fixo_alto_prefere_segmentos_longos():
+    assert escolher_duracao_segmento(3600, 5.0, 0.01) == SEGMENTO_MAXIMO_AUTO_S
+
+def test_varios_processos_preferem_segmentos_que_dividem_o_trabalho():
+    # 4 processos e 20 min de áudio: segmentos de 10 min deixariam 2 processos parados
+    assert escolher_duracao_segmento(1200, 0.0, 0.1, workers=4) <= 300
+
+def test_segmento_maior_que_a_sobreposicao():
+    assert escolher_duracao_segmento(3600, 0.0, 0.1, sobreposicao_s=45) > 45
+
+
+# calibrar_automaticamente
+
+@pytest.fixture
+def calibracao_falsa(monkeypatch):
+    """Modelos falsos com as VELOCIDADES acima; cada medição avança um relógio falso em `custo_medicao_s`."""
+    estado = {'relogio': 0.0, 'custo_medicao_s': 0.0, 'medidos': []}
+
+    def carregar_modelo(nome):
+        estado['carregado'] = nome
+        return types.SimpleNamespace(name=nome)
+
+    def medir(audio, transcrever):
+        estado['medidos'].append(estado['carregado'])
+        estado['relogio'] += estado['custo_medicao_s']
+        return 0.0, VELOCIDADES[estado['carregado']]
+
+    monkeypatch.setattr(split_audio, 'obter_info_audio', lambda arquivo: (16000, 3600.0))
+    monkeypatch.setattr(split_audio, 'carregar_trecho_calibracao', lambda arquivo, duracao: None)
+    monkeypatch.setattr(split_audio, 'carregar_modelo_whisper', carregar_modelo)
+    monkeypatch.setattr(split_audio, 'medir_velocidade_transcricao', medir)
+    monkeypatch.setattr(split_audio, 'time', types.SimpleNamespace(perf_counter=lambda: estado['relogio']))
+    return estado
+
+def test_sem_meta_calibra_so_o_modelo_pedido(calibracao_falsa):
+    calibracao, modelo, pool = split_audio.calibrar_automaticamente('aula.wav', 'small')
+    assert calibracao['modelo'] == 'small' and modelo.name == 'small' and pool is None
+    assert calibracao_falsa['medidos'] == ['small']
+
+def test_prazo_escolhe_o_maior_modelo_que_cumpre(calibracao_falsa):
+    # Previsões para 1 h de áudio: tiny 36 s, base 72 s, small 180 s, medium 360 s, large 720 s
+    calibracao, _, _ = split_audio.calibrar_automaticamente('aula.wav', 'base', prazo_s=400)
+    assert calibracao['modelo'] == 'medium'
+    assert calibracao_falsa['medidos'] == ['tiny', 'base', 'small', 'medium', 'large']
+
+def test_rtf_alvo_vira_prazo_pela_duracao(calibracao_falsa):
+    calibracao, _, _ = split_audio.calibrar_automaticamente('aula.wav', 'base', rtf_alvo=0.06)
+    assert calibracao['modelo'] == 'small'
+
+def test_tempo_de_calibracao_conta_para_o_prazo(calibracao_falsa):
+    # Cada medição custa 50 s: até o medium já se foram 200 s, e 200 + 360 passa de 400
+    calibracao_falsa['custo_medicao_s'] = 50.0
+    calibracao, _, _ = split_audio.calibrar_automaticamente('aula.wav', 'base', prazo_s=400)
+    assert calibracao['modelo'] == 'small'
+    assert calibracao_falsa['medidos'] == ['tiny', 'base', 'small', 'medium']
+
+def test_nenhum_modelo_cumpre_usa_o_menor(calibracao_falsa):
+    calibracao, _, _ = split_audio.calibrar_automaticamente('aula.wav', 'base', prazo_s=10)
+    assert calibracao['modelo'] == 'tiny'
+    assert calibracao_falsa['medidos'] == ['tiny']
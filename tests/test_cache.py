@@ -0,0 +1,102 @@
+"""Testes do cache de transcrições: chaves e descarte LRU."""
+
+import json
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import split_audio
+from split_audio import OPCOES_WHISPER, OPCOES_WHISPER_LOTE, CacheTranscricoes
+
+
+def resultado(texto):
+    return {'text': texto, 'segments': []}
+
+def tamanho(texto):
+    return len(json.dumps(resultado(texto), ensure_ascii=False).encode())
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio falso para `ultimo_acesso`: cada leitura avança um segundo."""
+    estado = {'agora': 0.0}
+
+    def agora():
+        estado['agora'] += 1
+        return estado['agora']
+
+    monkeypatch.setattr(split_audio, 'time', types.SimpleNamespace(time=agora))
+    return estado
+
+def abrir_cache(pasta, entradas):
+    """Cache com espaço para exatamente `entradas` resultados de um caractere."""
+    return CacheTranscricoes(str(pasta), tamanho_max_mb=entradas * tamanho("a") / (1024 * 1024))
+
+
+# gerar_chave
+
+def test_chave_muda_com_o_audio_o_modelo_e_as_opcoes():
+    audio = np.zeros(16000, dtype=np.float32)
+    chave = CacheTranscricoes.gerar_chave(audio, 'small')
+    assert chave == CacheTranscricoes.gerar_chave(audio.copy(), 'small', OPCOES_WHISPER)
+    assert chave != CacheTranscricoes.gerar_chave(audio + 0.5, 'small')
+    assert chave != CacheTranscricoes.gerar_chave(audio, 'medium')
+    assert chave != CacheTranscricoes.gerar_chave(audio, 'small', OPCOES_WHISPER_LOTE)
+    assert chave != CacheTranscricoes.gerar_chave(audio, 'small', dict(OPCOES_WHISPER, temperature=0.2))
+
+
+# guardar / descarte
+
+def test_descarta_a_entrada_menos_usada_recentemente(tmp_path, relogio):
+    cache = abrir_cache(tmp_path, 2)
+    try:
+        cache.guardar('a', resultado("a"))
+        cache.guardar('b', resultado("b"))
+        assert cache.obter('a') is not None  # 'a' passa a ser a mais recente
+        cache.guardar('c', resultado("c"))
+        assert cache.obter('b') is None
+        assert cache.obter('a') is not None and cache.obter('c') is not None
+    finally:
+        cache.fechar()
+
+def test_regravar_a_mesma_chave_nao_conta_duas_vezes(tmp_path, relogio):
+    cache = abrir_cache(tmp_path, 2)
+    try:
+        cache.guardar('a', resultado("a"))
+        cache.guardar('b', resultado("b"))
+        cache.guardar('b', resultado("b"))
+        assert cache.obter('a') is not None and cache.obter('b') is not None
+    finally:
+        cache.fechar()
+
+def test_total_continua_entre_execucoes(tmp_path, relogio):
+    cache = abrir_cache(tmp_path, 2)
+    cache.guardar('a', resultado("a"))
+    cache.guardar('b', resultado("b"))
+    cache.fechar()
+
+    cache = abrir_cache(tmp_path, 2)
+    try:
+        cache.guardar('c', resultado("c"))
+        assert cache.obter('a') is None
+        assert cache.obter('b') is not None and cache.obter('c') is not None
+    finally:
+        cache.fechar()
+
+def test_soma_completa_so_quando_passa_do_limite(tmp_path, relogio, monkeypatch):
+    cache = abrir_cache(tmp_path, 3)
+    somas = []
+    somar = cache._somar_tamanhos
+    monkeypatch.setattr(cache, '_somar_tamanhos', lambda: somas.append(1) or somar())
+    try:
+        for chave in "abc":
+            cache.guardar(chave, resultado(chave))
+        assert somas == []
+        cache.guardar('d', resultado("d"))
+        assert somas == [1]
+    finally:
+        cache.fechar()
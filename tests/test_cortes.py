@@ -0,0 +1,46 @@
+"""Testes do ajuste dos cortes para as pausas (--vad)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import ajustar_cortes_silencio
+
+
+def energia(num_quadros, pausas=(), nivel_db=-20.0, pausa_db=-60.0):
+    """Energia por quadro com `nivel_db` em todo o áudio e `pausa_db` nos quadros de `pausas`."""
+    energia_db = np.full(num_quadros, nivel_db)
+    energia_db[list(pausas)] = pausa_db
+    return energia_db
+
+
+def test_corte_vai_para_a_pausa_dentro_da_tolerancia():
+    # Quadros de 1 amostra: o corte cai no próprio índice do quadro
+    assert ajustar_cortes_silencio(energia(200, pausas=[104]), 1, [100], 10) == [104]
+
+def test_pausa_fora_da_tolerancia_e_ignorada():
+    assert ajustar_cortes_silencio(energia(200, pausas=[130]), 1, [100], 10) == [100]
+
+def test_empate_fica_com_o_quadro_mais_proximo():
+    assert ajustar_cortes_silencio(energia(200, pausas=[92, 103]), 1, [100], 10) == [103]
+
+def test_corte_fica_no_meio_do_quadro():
+    assert ajustar_cortes_silencio(energia(20, pausas=[12]), 10, [100], 30) == [125]
+
+def test_tolerancia_maior_que_meio_segmento_mantem_cortes_crescentes():
+    # Segmentos de 30 quadros e tolerância de 40: sem limite, os dois primeiros cortes
+    # iriam para a mesma pausa (quadro 65) e o segundo voltaria para antes do primeiro
+    cortes = ajustar_cortes_silencio(energia(120, pausas=[65]), 1, [30, 60, 90], 40)
+    assert cortes == [30, 65, 90]
+    assert all(anterior < seguinte for anterior, seguinte in zip(cortes, cortes[1:]))
+
+def test_cortes_crescentes_com_pausas_aleatorias():
+    gerador = np.random.default_rng(0)
+    for _ in range(50):
+        energia_db = gerador.uniform(-70, -10, 300)
+        cortes = ajustar_cortes_silencio(energia_db, 1, [30 * i for i in range(1, 10)], 45)
+        assert all(anterior < seguinte for anterior, seguinte in zip(cortes, cortes[1:]))
+        assert all(0 < corte < 300 for corte in cortes)
@@ -0,0 +1,77 @@
+"""Testes da costura de janelas com sobreposição (--sobreposicao)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import costurar_janela, remover_repeticao_inicial
+
+
+def resultado_whisper(*trechos):
+    """Resultado no formato do Whisper a partir de tuplas (start, end, text) relativas à janela."""
+    segments = [{'start': inicio, 'end': fim, 'text': f" {texto}"} for inicio, fim, texto in trechos]
+    return {'text': "".join(trecho['text'] for trecho in segments), 'segments': segments}
+
+
+# remover_repeticao_inicial
+
+def test_remove_sequencia_repetida_na_emenda():
+    assert remover_repeticao_inicial("como vimos na aula passada",
+                                     "na aula passada hoje vamos falar") == "hoje vamos falar"
+
+def test_ignora_caixa_e_pontuacao():
+    assert remover_repeticao_inicial("Como vimos na aula passada.",
+                                     "aula, passada hoje vamos") == "hoje vamos"
+
+def test_palavra_unica_repetida_nao_e_removida():
+    assert remover_repeticao_inicial("e então", "então começamos") == "então começamos"
+
+def test_sem_repeticao_mantem_texto():
+    assert remover_repeticao_inicial("fim do segmento", "outro assunto") == "outro assunto"
+
+def test_max_remover_limita_a_remocao():
+    # A repetição completa tem 4 palavras, mas só 3 podem ser removidas: nenhum final de 2-3 palavras coincide
+    assert remover_repeticao_inicial("a b c d", "a b c d e", max_remover=3) == "a b c d e"
+    assert remover_repeticao_inicial("x c d", "c d e", max_remover=2) == "e"
+    assert remover_repeticao_inicial("x c d", "c d e", max_remover=0) == "c d e"
+
+
+# costurar_janela
+
+def test_sem_margens_devolve_texto_do_whisper():
+    resultado = resultado_whisper((0.0, 4.0, "primeira frase"), (4.0, 9.0, "segunda frase"))
+    texto, trechos = costurar_janela(resultado, 0.0, 0.0, 10.0, False)
+    assert texto == "primeira frase segunda frase"
+    assert [trecho['inicio'] for trecho in trechos] == [0.0, 4.0]
+
+def test_trechos_ficam_com_a_janela_do_ponto_medio():
+    # Janela [237, 483) para o segmento [240, 480) com 3 s de margem de cada lado
+    resultado = resultado_whisper((0.0, 2.0, "fim do anterior"),
+                                  (2.0, 8.0, "dentro do segmento"),
+                                  (240.0, 246.0, "começo do próximo"))
+    texto, trechos = costurar_janela(resultado, 237.0, 240.0, 480.0, True)
+    assert texto == "dentro do segmento"
+    assert trechos == [{'inicio': 239.0, 'fim': 245.0, 'texto': "dentro do segmento"}]
+
+def test_ultima_janela_nao_tem_limite_final():
+    resultado = resultado_whisper((5.0, 10.0, "até o fim"))
+    texto, _ = costurar_janela(resultado, 477.0, 480.0, 485.0, False)
+    assert texto == "até o fim"
+
+def test_remove_repeticao_real_na_emenda():
+    # A janela anterior terminou o trecho em 479,5 s; esta o recomeça no meio, dentro da margem
+    resultado = resultado_whisper((0.5, 10.0, "vimos na aula passada hoje vamos falar de redes"))
+    texto, trechos = costurar_janela(resultado, 477.0, 480.0, 720.0, True,
+                                     texto_anterior="como vimos na aula passada")
+    assert texto == "hoje vamos falar de redes"
+    assert trechos[0]['inicio'] == 477.5
+
+def test_remocao_limitada_a_margem_nao_apaga_o_segmento():
+    # Um trecho longo (fala esparsa) que coincide com o final anterior: as palavras
+    # caem bem depois da margem de 3 s, então não são repetição da janela anterior
+    resultado = resultado_whisper((2.0, 223.0, "pessoal muito obrigado"))
+    texto, trechos = costurar_janela(resultado, 477.0, 480.0, 720.0, True,
+                                     texto_anterior="e é isso pessoal muito obrigado")
+    assert texto == "pessoal muito obrigado"
+    assert len(trechos) == 1
@@ -0,0 +1,110 @@
+"""Testes da retomada de jobs pelo manifesto (transcrição completa)."""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import (OPCOES_WHISPER, OpcoesTranscricao, carregar_manifesto, criar_manifesto,
+                         dividir_e_transcrever_completa, ler_diario, manifesto_compativel,
+                         obter_caminho_diario)
+
+LIMITES = [(0, 60), (60, 120), (120, 150)]
+
+
+class ModeloFalso:
+    """Modelo que numera as chamadas e pode falhar na chamada `falhar_em` (simula uma interrupção)."""
+    name = 'tiny'
+
+    def __init__(self, falhar_em=None):
+        self.chamadas = 0
+        self.falhar_em = falhar_em
+
+    def transcribe(self, audio, **opcoes):
+        self.chamadas += 1
+        if self.chamadas == self.falhar_em:
+            raise RuntimeError("interrompido")
+        texto = f" chamada {self.chamadas}"
+        return {'text': texto, 'segments': [{'start': 0.0, 'end': 1.0, 'text': texto}]}
+
+
+# manifesto_compativel
+
+def manifesto_base(**mudancas):
+    argumentos = dict(hash_arquivo='abc', nome_modelo='tiny', duracao_segmento_min=1, limites=LIMITES,
+                      sobreposicao_s=0, decodificacao=OpcoesTranscricao().decodificacao())
+    argumentos.update(mudancas)
+    # Passa por JSON como o manifesto gravado em disco
+    return json.loads(json.dumps(criar_manifesto('aula.wav', **argumentos))), argumentos
+
+def test_manifesto_igual_e_compativel():
+    manifesto, argumentos = manifesto_base()
+    assert manifesto_compativel(manifesto, **argumentos)
+
+@pytest.mark.parametrize('mudanca', [
+    {'hash_arquivo': 'outro'},
+    {'nome_modelo': 'small'},
+    {'limites': [(0, 60), (60, 150)]},
+    {'sobreposicao_s': 6},
+    {'decodificacao': OpcoesTranscricao(lote_whisper=8).decodificacao()},
+    {'decodificacao': OpcoesTranscricao(vad=True).decodificacao()},
+])
+def test_manifesto_incompativel_e_recusado(mudanca):
+    manifesto, argumentos = manifesto_base()
+    argumentos.update(mudanca)
+    assert not manifesto_compativel(manifesto, **argumentos)
+
+def test_manifesto_antigo_sem_decodificacao_e_recusado():
+    manifesto, argumentos = manifesto_base()
+    del manifesto['decodificacao']
+    assert not manifesto_compativel(manifesto, **argumentos)
+
+def test_decodificacao_distingue_os_motores():
+    assert OpcoesTranscricao().decodificacao()['whisper'] == OPCOES_WHISPER
+    assert OpcoesTranscricao(lote_whisper=4).decodificacao() != OpcoesTranscricao(lote_whisper=8).decodificacao()
+    # Sem --vad o limiar de fala não é usado
+    assert OpcoesTranscricao(limiar_fala=0.5).decodificacao() == OpcoesTranscricao().decodificacao()
+
+
+# dividir_e_transcrever_completa
+
+@pytest.fixture
+def aula(tmp_path, monkeypatch):
+    """Áudio de 2min30s já em 16 kHz (3 segmentos de 1 min, a sobra de 30 s vira segmento)."""
+    soundfile = pytest.importorskip('soundfile')
+    monkeypatch.chdir(tmp_path)
+    ruido = np.random.default_rng(0).normal(0, 0.1, 150 * 16000).astype(np.float32)
+    soundfile.write(tmp_path / "aula.wav", ruido, 16000)
+    return str(tmp_path / "aula.wav")
+
+def texto_final(tmp_path):
+    return (tmp_path / "aula_dividido" / "aula_transcricao_completa.txt").read_text(encoding='utf-8')
+
+def test_job_interrompido_retoma_so_os_segmentos_pendentes(aula, tmp_path):
+    opcoes = OpcoesTranscricao(nome_modelo='tiny')
+    assert not dividir_e_transcrever_completa(aula, 1, ModeloFalso(falhar_em=2), opcoes)
+    # Só o diário sabe do segmento 1: o manifesto é consolidado a partir dele na retomada
+    registros = ler_diario(obter_caminho_diario(str(tmp_path / "aula_dividido"), "aula"))
+    assert [registro['numero'] for registro in registros if registro.get('tipo') == 'segmento'] == [1]
+
+    modelo = ModeloFalso()
+    assert dividir_e_transcrever_completa(aula, 1, modelo, opcoes)
+    assert modelo.chamadas == 2
+    manifesto = carregar_manifesto(str(tmp_path / "aula_dividido"), "aula")
+    assert [entrada['status'] for entrada in manifesto['segmentos']] == ['concluido'] * 3
+    # O segmento 1 vem da primeira execução; 2 e 3 da retomada
+    assert [entrada['texto'].strip() for entrada in manifesto['segmentos']] == [
+        "chamada 1", "chamada 1", "chamada 2"]
+    assert "chamada 2" in texto_final(tmp_path)
+
+def test_opcoes_de_decodificacao_diferentes_recomecam_o_job(aula, tmp_path):
+    dividir_e_transcrever_completa(aula, 1, ModeloFalso(falhar_em=2), OpcoesTranscricao(nome_modelo='tiny'))
+
+    modelo = ModeloFalso()
+    opcoes_vad = OpcoesTranscricao(nome_modelo='tiny', vad=True, limiar_fala=0.0)
+    assert dividir_e_transcrever_completa(aula, 1, modelo, opcoes_vad)
+    assert modelo.chamadas == 3
@@ -0,0 +1,75 @@
+"""Testes da contagem de segmentos e da sobra final curta."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import FRACAO_CAUDA_MINIMA, carregar_segmentos, contar_segmentos, juntar_cauda_curta
+
+
+# contar_segmentos
+
+def test_divisao_simples_mantem_a_sobra_curta():
+    # 8min10s em segmentos de 4 min: 3 partes, a última com 10 s
+    assert contar_segmentos(490, 240) == 3
+
+def test_transcricao_junta_a_sobra_curta():
+    assert contar_segmentos(490, 240, FRACAO_CAUDA_MINIMA) == 2
+
+def test_sobra_a_partir_de_um_quarto_vira_segmento():
+    assert contar_segmentos(540, 240, FRACAO_CAUDA_MINIMA) == 3
+
+def test_divisao_exata_nao_cria_segmento_vazio():
+    assert contar_segmentos(480, 240) == 2
+    assert contar_segmentos(480, 240, FRACAO_CAUDA_MINIMA) == 2
+
+def test_arquivo_menor_que_um_segmento():
+    assert contar_segmentos(30, 240) == 1
+    assert contar_segmentos(30, 240, FRACAO_CAUDA_MINIMA) == 1
+
+
+# juntar_cauda_curta
+
+def blocos(*tamanhos):
+    return [np.full(tamanho, indice, dtype=np.float32) for indice, tamanho in enumerate(tamanhos)]
+
+def test_junta_o_ultimo_bloco_curto_ao_anterior():
+    saida = list(juntar_cauda_curta(iter(blocos(100, 100, 10)), 25))
+    assert [len(bloco) for bloco in saida] == [100, 110]
+    assert saida[1][-1] == 2
+
+def test_sem_minimo_mantem_os_blocos():
+    assert [len(bloco) for bloco in juntar_cauda_curta(iter(blocos(100, 100, 10)), 0)] == [100, 100, 10]
+
+def test_bloco_final_vazio_nunca_vira_segmento():
+    assert [len(bloco) for bloco in juntar_cauda_curta(iter(blocos(100, 100, 0)), 0)] == [100, 100]
+
+def test_bloco_unico_curto_e_mantido():
+    assert [len(bloco) for bloco in juntar_cauda_curta(iter(blocos(10)), 25)] == [10]
+
+
+# carregar_segmentos
+
+@pytest.fixture
+def audio_490s(tmp_path):
+    soundfile = pytest.importorskip('soundfile')
+    caminho = tmp_path / "aula.wav"
+    soundfile.write(caminho, np.zeros(490 * 100, dtype=np.float32), 100)
+    return str(caminho)
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_divisao_simples_mantem_cortes_fixos(audio_490s, streaming):
+    sample_rate, _, limites, gerador = carregar_segmentos(audio_490s, 4, streaming)
+    assert limites == [(0, 240), (240, 480), (480, 490)]
+    assert [len(segmento) / sample_rate for segmento in gerador] == [240, 240, 10]
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_transcricao_junta_a_sobra_ao_ultimo_segmento(audio_490s, streaming):
+    sample_rate, _, limites, gerador = carregar_segmentos(audio_490s, 4, streaming,
+                                                          fracao_cauda_minima=FRACAO_CAUDA_MINIMA)
+    assert limites == [(0, 240), (240, 490)]
+    assert [len(segmento) / sample_rate for segmento in gerador] == [240, 250]
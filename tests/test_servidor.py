@@ -0,0 +1,48 @@
+"""Testes da validação dos jobs do --servir."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import ServidorTranscricao, criar_parser, validar_opcoes_trabalho
+
+
+@pytest.fixture
+def servidor():
+    return ServidorTranscricao(criar_parser().parse_args([]))
+
+
+def test_opcoes_validas_sao_aceitas():
+    validar_opcoes_trabalho({'segmentos': 2, 'modelo': 'tiny', 'vad': True, 'tolerancia_corte': 5,
+                             'limiar_fala': 0.2, 'sobreposicao': 10.5}, 4)
+
+@pytest.mark.parametrize('opcoes', [
+    {'segmentos': 'abc'},
+    {'segmentos': 0},
+    {'segmentos': -1},
+    {'segmentos': True},
+    {'modelo': 'enorme'},
+    {'vad': 'sim'},
+    {'tolerancia_corte': -1},
+    {'limiar_fala': 1.5},
+    {'sobreposicao': 240},
+    {'segmentos': 1, 'sobreposicao': 60},
+])
+def test_opcoes_invalidas_sao_recusadas(opcoes):
+    with pytest.raises(ValueError):
+        validar_opcoes_trabalho(opcoes, 4)
+
+@pytest.mark.parametrize('pedido', [[1, 2], "x", 3, None])
+def test_corpo_que_nao_e_objeto_e_recusado(servidor, pedido):
+    with pytest.raises(ValueError):
+        servidor.enviar(pedido)
+
+def test_opcao_invalida_nao_entra_na_fila(servidor, tmp_path):
+    arquivo = tmp_path / "aula.wav"
+    arquivo.touch()
+    with pytest.raises(ValueError):
+        servidor.enviar({'arquivo': str(arquivo), 'segmentos': 0})
+    assert servidor.listar() == []
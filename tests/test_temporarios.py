@@ -0,0 +1,38 @@
+"""Testes da escrita atômica e da limpeza de temporários abandonados."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from split_audio import (IDADE_TEMPORARIO_ABANDONADO_S, _escrever_atomicamente, caminho_temporario,
+                         limpar_temporarios_abandonados)
+
+
+def test_temporarios_tem_nomes_unicos_na_mesma_pasta(tmp_path):
+    destino = str(tmp_path / "aula_manifesto.json")
+    primeiro, segundo = caminho_temporario(destino), caminho_temporario(destino)
+    assert primeiro != segundo
+    assert os.path.dirname(primeiro) == str(tmp_path) and primeiro.endswith('.tmp')
+
+def test_escrita_atomica_substitui_sem_deixar_temporario(tmp_path):
+    destino = tmp_path / "aula_transcricao_completa.txt"
+    _escrever_atomicamente(str(destino), "primeira")
+    _escrever_atomicamente(str(destino), "segunda")
+    assert destino.read_text(encoding='utf-8') == "segunda"
+    assert os.listdir(tmp_path) == [destino.name]
+
+def test_limpeza_remove_so_temporarios_antigos(tmp_path):
+    antigo = tmp_path / "aula_manifesto.json.123.abcd.tmp"
+    recente = tmp_path / "aula_manifesto.json.456.efgh.tmp"
+    outro = tmp_path / "aula_manifesto.json"
+    for arquivo in (antigo, recente, outro):
+        arquivo.write_text("x")
+    passado = time.time() - IDADE_TEMPORARIO_ABANDONADO_S - 60
+    os.utime(antigo, (passado, passado))
+    os.utime(outro, (passado, passado))
+
+    limpar_temporarios_abandonados(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted([recente.name, outro.name])
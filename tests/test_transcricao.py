@@ -0,0 +1,92 @@
+"""Testes da ordem, do cache e do motor em lote de transcrever_em_ordem (um único processo, sem Whisper)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import split_audio
+from split_audio import RESULTADO_PULADO, TAXA_WHISPER, CacheTranscricoes, transcrever_em_ordem
+
+
+def resultado_de(segmento):
+    return {'text': f"segmento {int(segmento[0])}", 'segments': []}
+
+@pytest.fixture
+def chamadas(monkeypatch):
+    """Substitui o Whisper: registra quantos segmentos vão em cada chamada (individual ou em lote)."""
+    registro = []
+
+    def transcrever_segmento(modelo, audio, lote_whisper=None):
+        registro.append(1)
+        return resultado_de(audio)
+
+    def transcrever_em_lote(modelo, audios, lote_whisper):
+        registro.append(len(audios))
+        return [resultado_de(audio) for audio in audios]
+
+    monkeypatch.setattr(split_audio, 'transcrever_segmento', transcrever_segmento)
+    monkeypatch.setattr(split_audio, 'transcrever_em_lote', transcrever_em_lote)
+    return registro
+
+def segmentos(quantidade, duracao_s=10, log=None):
+    """Segmentos (numero, áudio, duração): a primeira amostra do áudio guarda o número."""
+    for numero in range(1, quantidade + 1):
+        if log is not None:
+            log.append(f"lido {numero}")
+        audio = np.full(duracao_s * TAXA_WHISPER, numero, dtype=np.float32)
+        yield numero, audio, duracao_s
+
+
+@pytest.mark.parametrize('lote_whisper', [None, 2, 8])
+def test_resultados_saem_na_ordem(chamadas, lote_whisper):
+    saida = list(transcrever_em_ordem(segmentos(5), object(), lote_whisper=lote_whisper))
+    assert [numero for numero, _, _, _ in saida] == [1, 2, 3, 4, 5]
+    assert [resultado['text'] for _, _, _, resultado in saida] == [f"segmento {n}" for n in range(1, 6)]
+
+def test_lote_junta_segmentos_ate_o_tamanho(chamadas):
+    list(transcrever_em_ordem(segmentos(5), object(), lote_whisper=2))
+    assert chamadas == [2, 2, 1]
+
+def test_sem_juntar_cada_segmento_sai_antes_do_proximo_ser_lido(chamadas):
+    log = []
+    for numero, _, _, _ in transcrever_em_ordem(segmentos(3, log=log), object(), lote_whisper=8,
+                                                 juntar_segmentos=False):
+        log.append(f"entregue {numero}")
+    assert log == ["lido 1", "entregue 1", "lido 2", "entregue 2", "lido 3", "entregue 3"]
+    assert chamadas == [1, 1, 1]
+
+def test_segmentos_pulados_nao_passam_pelo_whisper(chamadas):
+    saida = list(transcrever_em_ordem(segmentos(4), object(), pular=lambda segmento: segmento[0] % 2 == 0))
+    assert [resultado is RESULTADO_PULADO for _, _, _, resultado in saida] == [False, True, False, True]
+    assert len(chamadas) == 2
+
+@pytest.mark.parametrize('lote_whisper', [None, 4])
+def test_cache_reaproveita_e_preserva_a_ordem(chamadas, tmp_path, lote_whisper):
+    cache = CacheTranscricoes(str(tmp_path))
+    try:
+        list(transcrever_em_ordem(segmentos(2), object(), 'tiny', cache=cache, lote_whisper=lote_whisper))
+        chamadas.clear()
+        saida = list(transcrever_em_ordem(segmentos(4), object(), 'tiny', cache=cache, lote_whisper=lote_whisper))
+    finally:
+        cache.fechar()
+    assert [numero for numero, _, _, _ in saida] == [1, 2, 3, 4]
+    assert [resultado['text'] for _, _, _, resultado in saida] == [f"segmento {n}" for n in range(1, 5)]
+    # Só os segmentos 3 e 4 são novos
+    assert sum(chamadas) == 2
+
+def test_pool_entrega_na_ordem_com_cache(chamadas, tmp_path):
+    # Um pool de threads no lugar dos processos: o caminho de envio e espera é o mesmo
+    from concurrent.futures import ThreadPoolExecutor
+    cache = CacheTranscricoes(str(tmp_path))
+    try:
+        list(transcrever_em_ordem(segmentos(2), object(), 'tiny', cache=cache))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            saida = list(transcrever_em_ordem(segmentos(6), None, 'tiny', workers=2, cache=cache, pool=pool))
+    finally:
+        cache.fechar()
+    assert [numero for numero, _, _, _ in saida] == [1, 2, 3, 4, 5, 6]
+    assert [resultado['text'] for _, _, _, resultado in saida] == [f"segmento {n}" for n in range(1, 7)]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Verificação de regressão do tempo de inicialização do Split Audio.
+Mede quanto custa importar split_audio.py (o caminho de uma divisão simples)
+e falha se o tempo passar do limite ou se alguma biblioteca pesada for
+importada logo no carregamento do módulo.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Bibliotecas que não podem ser importadas só por carregar o módulo
+MODULOS_PESADOS = ['numpy', 'librosa', 'soundfile', 'pydub', 'whisper', 'torch', 'tqdm']
+
+# Executado em um processo Python novo a cada medição
+CODIGO_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+import split_audio
+duracao = time.perf_counter() - inicio
+print(json.dumps({'segundos': duracao, 'modulos': sorted(sys.modules)}))
+"""
+
+def medir_inicializacao(repeticoes=5):
+    """Importa split_audio em processos novos e retorna (tempos em segundos, módulos pesados importados)."""
+    pasta_script = os.path.dirname(os.path.abspath(__file__))
+    tempos = []
+    pesados = set()
+    for _ in range(repeticoes):
+        resultado = subprocess.run([sys.executable, "-c", CODIGO_MEDICAO], cwd=pasta_script,
+                                   capture_output=True, text=True, check=True)
+        dados = json.loads(resultado.stdout.strip().splitlines()[-1])
+        tempos.append(dados['segundos'])
+        pesados.update(modulo for modulo in MODULOS_PESADOS if modulo in dados['modulos'])
+    return tempos, sorted(pesados)
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description='Verifica o tempo de inicialização do split_audio.py')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Quantas medições fazer (padrão: 5)')
+    parser.add_argument('--limite-ms', type=float, default=300,
+                        help='Tempo máximo aceito para a mediana, em milissegundos (padrão: 300)')
+    parser.add_argument('--json', action='store_true', help='Imprimir o resultado em JSON')
+    args = parser.parse_args()
+
+    tempos, pesados = medir_inicializacao(args.repeticoes)
+    mediana_ms = statistics.median(tempos) * 1000
+    aprovado = mediana_ms <= args.limite_ms and not pesados
+
+    if args.json:
+        print(json.dumps({
+            'mediana_ms': round(mediana_ms, 1),
+            'tempos_ms': [round(t * 1000, 1) for t in tempos],
+            'limite_ms': args.limite_ms,
+            'modulos_pesados': pesados,
+            'aprovado': aprovado,
+        }))
+    else:
+        print("⏱️ Tempo de inicialização do split_audio.py")
+        print("=" * 45)
+        print(f"📊 Mediana: {mediana_ms:.1f} ms (limite: {args.limite_ms:.0f} ms)")
+        print(f"📊 Medições: {', '.join(f'{t * 1000:.1f}' for t in tempos)} ms")
+        if pesados:
+            print(f"❌ Bibliotecas pesadas importadas na inicialização: {', '.join(pesados)}")
+        print("✅ Aprovado" if aprovado else "❌ Regressão detectada")
+
+    sys.exit(0 if aprovado else 1)
+
+if __name__ == "__main__":
+    main()